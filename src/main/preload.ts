@@ -11,7 +11,7 @@ export interface OpenVoiceStatus {
 
 // Vosk speech recognition result interface
 export interface VoskResult {
-  type: 'partial' | 'final';
+  type: 'partial' | 'confirmed' | 'final';
   text: string;
   words?: Array<{
     word: string;
@@ -29,7 +29,7 @@ interface VoskStatus {
 }
 
 interface VoskResult {
-  type: 'partial' | 'final';
+  type: 'partial' | 'confirmed' | 'final';
   text: string;
   words?: Array<{
     word: string;
@@ -5,26 +5,32 @@ Provides offline speech recognition using Vosk.
 Features:
 - Real-time streaming speech recognition
 - Automatic model download and setup
-- WebSocket-based communication for low latency
+- Results pushed over WebSocket (/stream) for low latency, with /results polling as fallback
+- Bidirectional WebSocket (/ws): binary PCM frames in, results out
+- Prometheus metrics (/metrics) when prometheus_client is installed
 - High accuracy with compact model
 """
 
 import os
 import sys
+import io
 import json
+import hashlib
 import logging
 import zipfile
 import shutil
 import threading
-import queue
 import wave
-import tempfile
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional, Callable, Dict, List, Tuple
 
 import requests
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 
 # Set up logging
@@ -43,20 +49,137 @@ except ImportError:
     logger.error("Vosk not installed. Run: pip install vosk")
     VOSK_AVAILABLE = False
 
+# GPU setup calls (vosk>=0.3.45). Every build exports them, but they only take effect in a CUDA
+# build of Vosk and are no-ops otherwise; the library offers no way to tell which build is installed.
+try:
+    from vosk import GpuInit, GpuThreadInit
+    VOSK_GPU_API = True
+except ImportError:
+    VOSK_GPU_API = False
+
+# WebRTC VAD is optional - without it silence is detected by frame energy (or not at all)
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    WEBRTCVAD_AVAILABLE = False
+
+# NumPy is optional - it backs an energy-based VAD when WebRTC VAD is not installed
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+VAD_AVAILABLE = WEBRTCVAD_AVAILABLE or NUMPY_AVAILABLE
+
+# flask-sock is optional - without it results are only available by polling /results
+try:
+    from flask_sock import Sock
+    FLASK_SOCK_AVAILABLE = True
+except ImportError:
+    FLASK_SOCK_AVAILABLE = False
+
+# soundfile is optional - without it /recognize uploads must be PCM WAV
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+# psutil is optional - only used to report memory use on /status
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# prometheus_client is optional - without it there is no /metrics endpoint
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# orjson is optional - Flask's stdlib json provider is used without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson for faster response encoding."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# Metrics for tuning chunk size, drop policy and scaling (only when prometheus_client is installed)
+if PROMETHEUS_AVAILABLE:
+    METRIC_QUEUE_DEPTH = Gauge('vosk_queue_depth', 'Audio chunks waiting to be decoded', ['session'])
+    METRIC_CHUNKS_DROPPED = Counter('vosk_chunks_dropped_total', 'Audio chunks dropped by backpressure')
+    METRIC_RTF = Histogram('vosk_rtf', 'Real-time factor of AcceptWaveform (processing time / audio time)',
+                           buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0))
+    METRIC_PARTIAL_TO_FINAL = Histogram('vosk_partial_to_final_latency_seconds',
+                                        'Time from the first partial of an utterance to its final')
+
+# Decoder for Vosk result strings
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
 app = Flask(__name__)
 CORS(app)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
+sock = Sock(app) if FLASK_SOCK_AVAILABLE else None
 
 # Global state
 vosk_model: Optional[Model] = None
 model_path: Optional[str] = None
 is_initialized = False
-is_recognizing = False
-recognition_thread: Optional[threading.Thread] = None
-stop_recognition_event = threading.Event()
-audio_queue: queue.Queue = queue.Queue()
+model_lock = threading.Lock()
+# Set once GpuInit() has run; every decoding thread then calls GpuThreadInit() before its first recognizer.
+# This records that GPU decoding was requested - it only happens if the installed Vosk is a CUDA build.
+gpu_requested = False
+# /recognize decodes run on a pool with one worker per CPU. AcceptWaveform releases the GIL,
+# so they decode in parallel while request threads keep handling HTTP and JSON.
+RECOGNIZE_WORKERS = os.cpu_count() or 4
+recognize_executor = ThreadPoolExecutor(max_workers=RECOGNIZE_WORKERS, thread_name_prefix='vosk-recognize',
+                                        initializer=lambda: _init_gpu_thread())
+# Idle single-shot recognizers by sample rate; reused across /recognize calls instead of rebuilt
+idle_recognizers: Dict[int, List['KaldiRecognizer']] = {}
+idle_recognizers_lock = threading.Lock()
+# Enough for every recognize worker to hold one
+MAX_IDLE_RECOGNIZERS = RECOGNIZE_WORKERS
 result_callback: Optional[Callable] = None
-latest_results: list = []
-results_lock = threading.Lock()
+
+# Streaming sessions keyed by the X-Session-Id header; clients without one share the default session.
+# Each session runs its own recognizer on a worker thread (at most one per CPU), so concurrent
+# clients decode in parallel. Workers are daemon threads so an active session never blocks shutdown.
+DEFAULT_SESSION_ID = 'default'
+MAX_SESSIONS = os.cpu_count() or 4
+sessions: Dict[str, 'RecognitionSession'] = {}
+sessions_lock = threading.Lock()
+
+# Queue capacity in chunks; past 80% the oldest chunk is dropped to keep recognition near real time
+AUDIO_QUEUE_CAPACITY = 64
+AUDIO_QUEUE_HIGH_WATER = AUDIO_QUEUE_CAPACITY * 4 // 5
+# A warning is logged every DROP_LOG_INTERVAL chunks a session drops
+DROP_LOG_INTERVAL = 50
+# Queued chunks are coalesced up to this much audio per AcceptWaveform call
+COALESCE_TARGET_MS = 300
+# Local agreement: once this many consecutive partials share a prefix that has grown by
+# CONFIRM_MIN_WORDS since the last commit, the new words are sent as a 'confirmed' result
+LOCAL_AGREEMENT_PARTIALS = 3
+CONFIRM_MIN_WORDS = 3
+# /audio bodies are read from the input stream in pieces of this size
+AUDIO_STREAM_READ_BYTES = 8192
+# How long /ws waits for an audio frame before checking for results to push back
+WS_RECEIVE_TIMEOUT = 0.05
 
 # Model configuration
 # Using vosk-model-en-us-0.22-lgraph - 128MB, excellent accuracy, good speed balance
@@ -64,11 +187,42 @@ results_lock = threading.Lock()
 MODEL_URL = "https://alphacephei.com/vosk/models/vosk-model-en-us-0.22-lgraph.zip"
 MODEL_NAME = "vosk-model-en-us-0.22-lgraph"
 MODEL_SIZE_MB = 128
+# SHA-256 of the model archive; when set, downloads that don't match are rejected and retried.
+# Independently of it, truncated downloads and members failing their zip CRC-32 are rejected.
+MODEL_SHA256: Optional[str] = None
+
+# Voice activity gating: 30ms frames, 300ms pre-roll, utterance ends after 500ms of silence
+VAD_AGGRESSIVENESS = 2
+VAD_FRAME_MS = 30
+VAD_PREROLL_MS = 300
+VAD_SILENCE_MS = 500
+VAD_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+# Frame RMS (16-bit scale) treated as speech by the energy fallback VAD
+VAD_ENERGY_THRESHOLD = 300
+# An utterance still open after this much decoded audio is forced to a final, bounding decoder state
+MAX_UTTERANCE_SECS = 20
+# Without a VAD gate, chunks whose samples all lie in [-2**SILENCE_FLOOR_BITS, 2**SILENCE_FLOOR_BITS)
+# (about -54 dBFS) are skipped between utterances
+SILENCE_FLOOR_BITS = 6
 
 # Grammar constraint for Voice Training (when set, limits recognition to these words)
 current_grammar: Optional[list] = None
+# Vocabulary the current grammar was built from; resending the same words skips the rebuild
+current_grammar_key: Optional[frozenset] = None
+# Grammar JSON passed to new recognizers, encoded once per vocabulary
+current_grammar_json: Optional[str] = None
 grammar_lock = threading.Lock()
 
+# Common filler words added to every grammar for natural speech
+GRAMMAR_FILLERS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'shall', 'can', 'it', 'its', 'this',
+    'that', 'these', 'those', 'i', 'you', 'he', 'she', 'we', 'they', 'my',
+    'your', 'his', 'her', 'our', 'their', 'me', 'him', 'us', 'them'
+])
+
 
 def get_model_dir() -> Path:
     """Get the directory where the Vosk model should be stored."""
@@ -104,7 +258,6 @@ def download_model(progress_callback: Optional[Callable] = None, max_retries: in
 
     logger.info(f"Downloading Vosk model from {MODEL_URL}")
 
-    zip_path = model_dir / f"{MODEL_NAME}.zip"
     last_error = None
 
     for attempt in range(max_retries):
@@ -124,46 +277,64 @@ def download_model(progress_callback: Optional[Callable] = None, max_retries: in
             total_size = int(response.headers.get('content-length', 0))
             downloaded = 0
 
-            with open(zip_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if progress_callback and total_size > 0:
-                            progress = int((downloaded / total_size) * 100)
-                            progress_callback(progress, f"Downloading model: {progress}%")
+            # Keep the archive in memory and hash it as it arrives - no zip file round-trip on disk
+            archive = io.BytesIO()
+            sha256 = hashlib.sha256()
+            for chunk in response.iter_content(chunk_size=65536):
+                if chunk:
+                    archive.write(chunk)
+                    sha256.update(chunk)
+                    downloaded += len(chunk)
+                    if progress_callback and total_size > 0:
+                        progress = int((downloaded / total_size) * 100)
+                        progress_callback(progress, f"Downloading model: {progress}%")
+
+            if total_size and downloaded != total_size:
+                raise IOError(f"Model download truncated: got {downloaded} of {total_size} bytes")
+
+            digest = sha256.hexdigest()
+            logger.info(f"Download complete (sha256 {digest}), verifying...")
+            if MODEL_SHA256 and digest != MODEL_SHA256:
+                raise IOError(f"Model archive checksum mismatch: expected {MODEL_SHA256}, got {digest}")
 
-            logger.info("Download complete, extracting...")
             if progress_callback:
                 progress_callback(100, "Extracting model...")
 
-            # Extract
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            with zipfile.ZipFile(archive, 'r') as zip_ref:
+                # Check every member's CRC before extracting, so a corrupt archive never
+                # leaves a half-written model that later looks installed
+                bad_member = zip_ref.testzip()
+                if bad_member:
+                    raise IOError(f"Model archive is corrupt: bad CRC for {bad_member}")
                 zip_ref.extractall(model_dir)
 
-            # Clean up zip file
-            zip_path.unlink()
-
             logger.info(f"Model extracted to {model_path}")
             return str(model_path)
 
-        except (requests.exceptions.RequestException, IOError) as e:
+        except (requests.exceptions.RequestException, zipfile.BadZipFile, IOError) as e:
             last_error = e
             logger.warning(f"Download attempt {attempt + 1}/{max_retries} failed: {e}")
-            if zip_path.exists():
-                try:
-                    zip_path.unlink()
-                except OSError:
-                    pass
 
     # All retries exhausted
     logger.error(f"Failed to download model after {max_retries} attempts: {last_error}")
     raise RuntimeError(f"Failed to download Vosk model after {max_retries} attempts: {last_error}")
 
 
+def _cuda_devices_selected() -> bool:
+    """Whether CUDA_VISIBLE_DEVICES selects a GPU for this process."""
+    devices = os.environ.get('CUDA_VISIBLE_DEVICES', '').strip()
+    return bool(devices) and devices != '-1'
+
+
+def _init_gpu_thread():
+    """Attach the calling decoding thread to the GPU, if GPU decoding was requested."""
+    if gpu_requested:
+        GpuThreadInit()
+
+
 def initialize_model(progress_callback: Optional[Callable] = None) -> bool:
     """Initialize the Vosk model."""
-    global vosk_model, model_path, is_initialized
+    global vosk_model, model_path, is_initialized, gpu_requested
 
     if not VOSK_AVAILABLE:
         logger.error("Vosk is not available")
@@ -173,43 +344,98 @@ def initialize_model(progress_callback: Optional[Callable] = None) -> bool:
         logger.info("Model already initialized")
         return True
 
-    try:
-        # Download model if needed
-        model_path = download_model(progress_callback)
+    # Concurrent first requests must not load the model twice
+    with model_lock:
+        if is_initialized and vosk_model is not None:
+            return True
 
-        if progress_callback:
-            progress_callback(100, "Loading model...")
+        try:
+            # Download model if needed
+            model_path = download_model(progress_callback)
+
+            if progress_callback:
+                progress_callback(100, "Loading model...")
+
+            # GPU decoding must be set up before the model is loaded
+            if _cuda_devices_selected():
+                if VOSK_GPU_API:
+                    GpuInit()
+                    gpu_requested = True
+                    logger.info("GPU decoding requested (effective only with a CUDA build of Vosk)")
+                else:
+                    logger.warning("CUDA_VISIBLE_DEVICES is set but this Vosk version has no GPU API, "
+                                   "decoding on CPU")
 
-        # Load model
-        logger.info(f"Loading Vosk model from {model_path}")
-        vosk_model = Model(model_path)
-        is_initialized = True
+            # Load model
+            logger.info(f"Loading Vosk model from {model_path}")
+            vosk_model = Model(model_path)
+            is_initialized = True
 
-        logger.info("Vosk model initialized successfully")
-        return True
+            logger.info("Vosk model initialized successfully")
+            return True
 
-    except Exception as e:
-        logger.error(f"Failed to initialize model: {e}")
-        is_initialized = False
+        except Exception as e:
+            logger.error(f"Failed to initialize model: {e}")
+            is_initialized = False
+            return False
+
+
+def ensure_model_loaded() -> bool:
+    """Load the model on first use if it is already on disk.
+
+    Idle services don't hold the model in memory until recognition is needed.
+    Never downloads implicitly - that still requires /initialize.
+    """
+    if is_initialized and vosk_model is not None:
+        return True
+    if not (get_model_dir() / MODEL_NAME / 'am' / 'final.mdl').exists():
         return False
+    return initialize_model()
+
+
+def _process_rss_mb() -> Optional[float]:
+    """Resident memory of this process in MB, if psutil is available."""
+    if not PSUTIL_AVAILABLE:
+        return None
+    return round(psutil.Process().memory_info().rss / (1024 * 1024), 1)
+
+
+def _acquire_recognizer(sample_rate: int) -> 'KaldiRecognizer':
+    """Take an idle free-form recognizer for this sample rate, creating one if none is idle."""
+    with idle_recognizers_lock:
+        pool = idle_recognizers.get(sample_rate)
+        if pool:
+            return pool.pop()
+
+    recognizer = KaldiRecognizer(vosk_model, sample_rate)
+    recognizer.SetWords(True)
+    return recognizer
+
+
+def _release_recognizer(sample_rate: int, recognizer: 'KaldiRecognizer'):
+    """Reset a recognizer and keep it for reuse (up to MAX_IDLE_RECOGNIZERS per sample rate)."""
+    recognizer.Reset()
+    with idle_recognizers_lock:
+        pool = idle_recognizers.setdefault(sample_rate, [])
+        if len(pool) < MAX_IDLE_RECOGNIZERS:
+            pool.append(recognizer)
 
 
 def recognize_audio_data(audio_data: bytes, sample_rate: int = 16000) -> dict:
     """Recognize speech from raw audio data (single shot)."""
-    global vosk_model
-
     if not is_initialized or vosk_model is None:
         return {"error": "Model not initialized"}
 
     try:
-        recognizer = KaldiRecognizer(vosk_model, sample_rate)
-        recognizer.SetWords(True)
-
-        # Process audio
-        if recognizer.AcceptWaveform(audio_data):
-            result = json.loads(recognizer.Result())
-        else:
-            result = json.loads(recognizer.PartialResult())
+        recognizer = _acquire_recognizer(sample_rate)
+        try:
+            # Process audio
+            if recognizer.AcceptWaveform(audio_data):
+                result = json_loads(recognizer.Result())
+            else:
+                result = json_loads(recognizer.PartialResult())
+        finally:
+            _release_recognizer(sample_rate, recognizer)
 
         return result
 
@@ -218,65 +444,288 @@ def recognize_audio_data(audio_data: bytes, sample_rate: int = 16000) -> dict:
         return {"error": str(e)}
 
 
+def _read_audio_upload(data: bytes) -> Tuple[bytes, int]:
+    """Decode an uploaded audio file in memory.
+
+    PCM WAV is parsed with the wave module; anything else (FLAC, OGG, float WAV)
+    is decoded by soundfile, if installed, and mixed down to 16-bit mono.
+
+    Returns:
+        Tuple of (pcm_audio, sample_rate)
+    """
+    buffer = io.BytesIO(data)
+    try:
+        with wave.open(buffer, 'rb') as wf:
+            return wf.readframes(wf.getnframes()), wf.getframerate()
+    except (wave.Error, EOFError):
+        if not SOUNDFILE_AVAILABLE:
+            raise
+
+    buffer.seek(0)
+    samples, sample_rate = sf.read(buffer, dtype='int16')
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1).astype('int16')
+    return samples.tobytes(), sample_rate
+
+
+def _scan_string_field(raw: str, key: str) -> str:
+    """Extract a string field from a raw Vosk result without a full JSON decode.
+
+    Vosk emits flat objects with sorted keys and plain-word values, so the value
+    is the first quoted string after the key. Escapes are left as-is, which keeps
+    the returned text valid for splicing back into JSON. Only safe when the key is
+    the first field, as "partial" is; finals are decoded with json_loads instead.
+    """
+    pos = raw.find(f'"{key}"')
+    if pos < 0:
+        return ''
+    start = raw.find('"', pos + len(key) + 2) + 1
+    if start <= 0:
+        return ''
+    end = raw.find('"', start)
+    return raw[start:end] if end > start else ''
+
+
+def _common_prefix_length(word_lists) -> int:
+    """Number of leading words shared by every list."""
+    first = word_lists[0]
+    shortest = min(len(words) for words in word_lists)
+    for i in range(shortest):
+        if any(words[i] != first[i] for words in word_lists):
+            return i
+    return shortest
+
+
+def _encode_result(result_type: str, raw: str, text: str, words_key: str) -> str:
+    """Wrap a raw Vosk result as a {"type", "text", "words"} JSON string.
+
+    The word-timing array is sliced out of the raw string verbatim, so neither a
+    decode nor a re-encode happens on the streaming path.
+    """
+    words = '[]'
+    pos = raw.find(f'"{words_key}"')
+    if pos >= 0:
+        start = raw.find('[', pos)
+        end = raw.find(']', start)
+        if start >= 0 and end > start:
+            words = raw[start:end + 1]
+    return f'{{"type":"{result_type}","text":"{text}","words":{words}}}'
+
+
+@lru_cache(maxsize=16)
+def _silence_mask(num_bytes: int) -> int:
+    """Bits SILENCE_FLOOR_BITS..14 of every 16-bit lane, repeated across num_bytes as one integer."""
+    lane = ((1 << 15) - 1) ^ ((1 << SILENCE_FLOOR_BITS) - 1)
+    return int.from_bytes(lane.to_bytes(2, 'little') * (num_bytes // 2), 'little')
+
+
+def _is_silent(chunk: bytes) -> bool:
+    """Whether every 16-bit sample in the chunk is below the silence floor.
+
+    SWAR check with no per-sample Python work: the chunk is read as one big
+    integer, and a sample is quiet when its high bits are all copies of its sign
+    bit, i.e. v ^ (v >> 1) has none of the masked bits set in its lane.
+    """
+    usable = len(chunk) & ~1
+    value = int.from_bytes(chunk[:usable] if usable != len(chunk) else chunk, 'little')
+    return not (value ^ (value >> 1)) & _silence_mask(usable)
+
+
+class VoiceActivityGate:
+    """Drops silence from a 16-bit mono PCM stream before it reaches the recognizer.
+
+    Speech frames pass through together with a short pre-roll so word onsets are
+    kept. After VAD_SILENCE_MS of continuous silence the utterance is reported as
+    ended so the caller can flush a final result early. Frames are classified by
+    WebRTC VAD when installed, otherwise by their RMS energy.
+    """
+
+    def __init__(self, sample_rate: int):
+        self._vad = webrtcvad.Vad(VAD_AGGRESSIVENESS) if WEBRTCVAD_AVAILABLE else None
+        self._sample_rate = sample_rate
+        self._frame_bytes = sample_rate * VAD_FRAME_MS // 1000 * 2
+        self._remainder = b''
+        self._preroll: deque = deque(maxlen=VAD_PREROLL_MS // VAD_FRAME_MS)
+        self._in_speech = False
+        self._silence_ms = 0
+
+    def _speech_flags(self, view: memoryview, usable: int):
+        """Classify each whole frame of the buffer as speech or silence."""
+        if self._vad is not None:
+            return (self._vad.is_speech(view[offset:offset + self._frame_bytes], self._sample_rate)
+                    for offset in range(0, usable, self._frame_bytes))
+
+        # Zero-copy int16 view over the buffer; per-frame RMS in one vectorised pass
+        samples = np.frombuffer(view[:usable], dtype=np.int16).astype(np.float32)
+        frames = samples.reshape(-1, self._frame_bytes // 2)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return (rms >= VAD_ENERGY_THRESHOLD).tolist()
+
+    def process(self, chunk: bytes) -> List[Tuple[bytes, bool]]:
+        """Split a chunk into speech segments.
+
+        Returns:
+            List of (speech_audio, utterance_ended) pairs in stream order
+        """
+        data = self._remainder + chunk if self._remainder else chunk
+        usable = len(data) - len(data) % self._frame_bytes
+        self._remainder = bytes(data[usable:])
+
+        # Frames are zero-copy views; bytes are only materialised by the final join
+        view = memoryview(data)
+        segments = []
+        voiced = []
+        flags = self._speech_flags(view, usable)
+        for offset, is_speech in zip(range(0, usable, self._frame_bytes), flags):
+            frame = view[offset:offset + self._frame_bytes]
+            if is_speech:
+                if not self._in_speech:
+                    self._in_speech = True
+                    voiced.extend(self._preroll)
+                    self._preroll.clear()
+                self._silence_ms = 0
+                voiced.append(frame)
+            elif self._in_speech:
+                # Trailing silence is still decoded so the recognizer sees the word ending
+                voiced.append(frame)
+                self._silence_ms += VAD_FRAME_MS
+                if self._silence_ms >= VAD_SILENCE_MS:
+                    self._in_speech = False
+                    segments.append((b''.join(voiced), True))
+                    voiced = []
+            else:
+                self._preroll.append(frame)
+
+        if voiced:
+            segments.append((b''.join(voiced), False))
+        return segments
+
+
+def _encode_results_envelope(results: list, recognizing: bool) -> str:
+    """Build the {"results": [...], "is_recognizing": ...} body from pre-encoded results."""
+    return ('{"results":[' + ','.join(results) + '],"is_recognizing":'
+            + ('true' if recognizing else 'false') + '}')
+
+
 def set_grammar(words: Optional[list] = None):
     """Set grammar constraint for recognition (or None for free-form recognition)."""
-    global current_grammar
+    global current_grammar, current_grammar_key, current_grammar_json
     with grammar_lock:
         if words:
-            # Create unique word list, lowercase, and add common variations
-            unique_words = list(set(w.lower().strip() for w in words if w.strip()))
-            # Add common filler words for natural speech
-            fillers = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-                      'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
-                      'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-                      'should', 'may', 'might', 'must', 'shall', 'can', 'it', 'its', 'this',
-                      'that', 'these', 'those', 'i', 'you', 'he', 'she', 'we', 'they', 'my',
-                      'your', 'his', 'her', 'our', 'their', 'me', 'him', 'us', 'them']
-            unique_words.extend(fillers)
-            current_grammar = list(set(unique_words))
+            # Unique lowercase vocabulary plus filler words, deduplicated in one pass
+            vocabulary = frozenset(w.lower().strip() for w in words if w.strip()) | GRAMMAR_FILLERS
+            if vocabulary == current_grammar_key:
+                return
+            # Sorted so the grammar JSON is stable for identical vocabularies
+            current_grammar = sorted(vocabulary)
+            current_grammar_key = vocabulary
+            current_grammar_json = json.dumps(current_grammar)
             logger.info(f"Grammar set with {len(current_grammar)} words")
         else:
             current_grammar = None
+            current_grammar_key = None
+            current_grammar_json = None
             logger.info("Grammar cleared - free-form recognition enabled")
 
 
-def start_streaming_recognition(sample_rate: int = 16000, grammar: Optional[list] = None):
-    """Start streaming recognition in a background thread.
+class RecognitionSession:
+    """Streaming recognition state for one client.
 
-    Args:
-        sample_rate: Audio sample rate (default 16000)
-        grammar: Optional list of words to constrain recognition to.
-                 If None, uses current_grammar (if set) or free-form recognition.
+    Each session owns its audio queue, recognizer and results, so concurrent
+    clients decode in parallel on their own worker threads instead of sharing one
+    recognizer.
     """
-    global is_recognizing, recognition_thread, stop_recognition_event, audio_queue, latest_results
-
-    if not is_initialized or vosk_model is None:
-        return False
-
-    if is_recognizing:
-        logger.warning("Recognition already running")
-        return True
-
-    # Set grammar if provided
-    if grammar is not None:
-        set_grammar(grammar)
-
-    stop_recognition_event.clear()
-    audio_queue = queue.Queue()
-    with results_lock:
-        latest_results = []
-
-    def recognition_worker():
-        global is_recognizing
-        nonlocal sample_rate
 
+    def __init__(self, session_id: str, sample_rate: int, use_vad: bool):
+        self.session_id = session_id
+        self.sample_rate = sample_rate
+        self.use_vad = use_vad
+        self.is_recognizing = False
+        self.stop_event = threading.Event()
+        # Pending audio chunks; the worker sleeps on audio_condition until a chunk or stop arrives
+        self.audio_queue: deque = deque()
+        self.audio_condition = threading.Condition()
+        self.dropped_chunks = 0
+        # Results are held pre-encoded as JSON strings so /results never re-serializes them.
+        # results_lock guards the partial slot so it is taken and cleared in one step.
+        self.final_results: deque = deque(maxlen=512)
+        self.current_partial: Optional[str] = None
+        self.results_lock = threading.Lock()
+        # Set whenever a result is published so WebSocket subscribers wake immediately
+        self.results_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def is_running(self) -> bool:
+        """Whether the worker is alive and has not been asked to stop."""
+        return not self.stop_event.is_set() and self.thread is not None and self.thread.is_alive()
+
+    def add_audio_chunk(self, audio_data: bytes) -> bool:
+        """Add audio chunk to the recognition queue.
+
+        Returns:
+            True if the oldest queued chunk was dropped to make room (backpressure)
+        """
+        dropped = False
+        with self.audio_condition:
+            if len(self.audio_queue) >= AUDIO_QUEUE_HIGH_WATER:
+                self.audio_queue.popleft()
+                dropped = True
+                self.dropped_chunks += 1
+                if PROMETHEUS_AVAILABLE:
+                    METRIC_CHUNKS_DROPPED.inc()
+                if self.dropped_chunks % DROP_LOG_INTERVAL == 1:
+                    logger.warning(f"Session {self.session_id} is falling behind - "
+                                   f"dropped {self.dropped_chunks} audio chunks so far")
+            self.audio_queue.append(audio_data)
+            self.audio_condition.notify()
+        return dropped
+
+    def drain_results(self) -> list:
+        """Take all pending finals and confirmed results plus the current partial (as JSON strings)."""
+        results = []
+        while True:
+            try:
+                results.append(self.final_results.popleft())
+            except IndexError:
+                break
+
+        with self.results_lock:
+            partial = self.current_partial
+            self.current_partial = None
+        if partial is not None:
+            results.append(partial)
+        return results
+
+    def wait_for_results(self, timeout: float) -> bool:
+        """Block until a result is published (or timeout); True if one was."""
+        published = self.results_event.wait(timeout)
+        self.results_event.clear()
+        return published
+
+    def stop(self, timeout: float = 2.0):
+        """Signal the worker to stop and wait briefly for it to finish."""
+        with self.audio_condition:
+            self.stop_event.set()
+            self.audio_condition.notify_all()
+        self.is_recognizing = False
+        self.results_event.set()
+
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=timeout)
+            if self.thread.is_alive():
+                logger.warning(f"Session {self.session_id} worker did not stop within {timeout}s")
+
+    def run(self):
+        """Recognition worker, executed on the session's thread."""
+        sample_rate = self.sample_rate
         try:
+            _init_gpu_thread()
+
             # Create recognizer - with or without grammar constraint
             with grammar_lock:
                 if current_grammar:
                     # Use grammar-constrained recognizer for better accuracy on known vocabulary
-                    grammar_json = json.dumps(current_grammar)
-                    recognizer = KaldiRecognizer(vosk_model, sample_rate, grammar_json)
+                    recognizer = KaldiRecognizer(vosk_model, sample_rate, current_grammar_json)
                     logger.info(f"Created grammar-constrained recognizer with {len(current_grammar)} words")
                 else:
                     # Free-form recognition for general speech-to-text
@@ -286,81 +735,261 @@ def start_streaming_recognition(sample_rate: int = 16000, grammar: Optional[list
             recognizer.SetWords(True)
             recognizer.SetPartialWords(True)
 
-            logger.info("Streaming recognition started")
-            is_recognizing = True
+            # Bind the per-frame FFI calls once rather than resolving them on every chunk
+            accept_waveform = recognizer.AcceptWaveform
+            final_result = recognizer.Result
+            partial_result = recognizer.PartialResult
+
+            vad_gate = None
+            if self.use_vad and VAD_AVAILABLE:
+                if sample_rate in VAD_SAMPLE_RATES or not WEBRTCVAD_AVAILABLE:
+                    vad_gate = VoiceActivityGate(sample_rate)
+                else:
+                    logger.warning(f"VAD does not support {sample_rate} Hz audio, gating disabled")
+
+            last_partial_text = ''
+            # Word lists of the latest distinct partials, and how many leading words are already confirmed
+            recent_partials: deque = deque(maxlen=LOCAL_AGREEMENT_PARTIALS)
+            confirmed_words = 0
+
+            # When the current utterance's first partial was published (for the latency metric)
+            first_partial_at: Optional[float] = None
+
+            def publish_final(raw_final: str):
+                nonlocal last_partial_text, confirmed_words, first_partial_at
+                # Decoded in full: the word array precedes "text" and may itself contain the word "text"
+                final_text = json_loads(raw_final).get('text', '')
+                if final_text:
+                    # Re-escaped so the text can be spliced back into the result JSON
+                    escaped_text = json.dumps(final_text, ensure_ascii=False)[1:-1]
+                    encoded = _encode_result('final', raw_final, escaped_text, 'result')
+                    with self.results_lock:
+                        self.final_results.append(encoded)
+                        # The final supersedes whatever partial preceded it
+                        self.current_partial = None
+                    self.results_event.set()
+                    logger.debug(f"Final: {final_text}")
+                    if PROMETHEUS_AVAILABLE and first_partial_at is not None:
+                        METRIC_PARTIAL_TO_FINAL.observe(time.perf_counter() - first_partial_at)
+                last_partial_text = ''
+                first_partial_at = None
+                recent_partials.clear()
+                confirmed_words = 0
+
+            def confirm_agreed_prefix(partial_text: str):
+                """Commit words the recent partials agree on without waiting for Vosk's endpointer.
+
+                The 'confirmed' result carries only the newly agreed words; the
+                utterance's final still carries its full text.
+                """
+                nonlocal confirmed_words
+                words = partial_text.split(' ')
+                recent_partials.append(words)
+                if len(recent_partials) < LOCAL_AGREEMENT_PARTIALS:
+                    return
+                agreed = _common_prefix_length(recent_partials)
+                if agreed - confirmed_words >= CONFIRM_MIN_WORDS:
+                    confirmed_text = ' '.join(words[confirmed_words:agreed])
+                    confirmed_words = agreed
+                    self.final_results.append(_encode_result('confirmed', '', confirmed_text, 'result'))
+                    self.results_event.set()
+                    logger.debug(f"Confirmed: {confirmed_text}")
+
+            def publish_partial(raw_partial: str):
+                nonlocal last_partial_text, first_partial_at
+                partial_text = _scan_string_field(raw_partial, 'partial')
+                # Only re-encode when the partial text actually changed
+                if partial_text and partial_text != last_partial_text:
+                    if first_partial_at is None:
+                        first_partial_at = time.perf_counter()
+                    last_partial_text = partial_text
+                    encoded = _encode_result('partial', raw_partial, partial_text, 'partial_result')
+                    with self.results_lock:
+                        self.current_partial = encoded
+                    confirm_agreed_prefix(partial_text)
+                    self.results_event.set()
+                    logger.debug(f"Partial: {partial_text}")
+
+            # Between utterances (after a final, or before any speech) silent chunks skip the decoder;
+            # within one they are still decoded so Vosk's endpointer can finish it
+            in_utterance = False
+            # 16-bit mono PCM
+            bytes_per_second = sample_rate * 2
+            utterance_bytes = 0
+            max_utterance_bytes = bytes_per_second * MAX_UTTERANCE_SECS
+
+            def end_utterance():
+                """Flush the open utterance as a final and drop the recognizer's decoding state."""
+                nonlocal in_utterance, utterance_bytes
+                publish_final(recognizer.FinalResult())
+                recognizer.Reset()
+                in_utterance = False
+                utterance_bytes = 0
+
+            def decode(audio: bytes):
+                nonlocal in_utterance, utterance_bytes
+                if PROMETHEUS_AVAILABLE:
+                    started = time.perf_counter()
+                    accepted = accept_waveform(audio)
+                    METRIC_RTF.observe((time.perf_counter() - started) * bytes_per_second / len(audio))
+                else:
+                    accepted = accept_waveform(audio)
+
+                if accepted:
+                    in_utterance = False
+                    utterance_bytes = 0
+                    publish_final(final_result())
+                    return
+
+                utterance_bytes += len(audio)
+                if utterance_bytes >= max_utterance_bytes:
+                    # Continuous speech without an endpoint would otherwise grow the lattice unboundedly
+                    logger.debug(f"Utterance exceeded {MAX_UTTERANCE_SECS}s, forcing a final")
+                    end_utterance()
+                else:
+                    publish_partial(partial_result())
+
+            coalesce_bytes = bytes_per_second * COALESCE_TARGET_MS // 1000
+            audio_queue = self.audio_queue
+            audio_condition = self.audio_condition
+            stop_event = self.stop_event
+            queue_depth = METRIC_QUEUE_DEPTH.labels(session=self.session_id) if PROMETHEUS_AVAILABLE else None
+
+            logger.info(f"Streaming recognition started for session {self.session_id} "
+                        f"(VAD {'on' if vad_gate else 'off'})")
+            self.is_recognizing = True
+
+            while True:
+                # Block until the producer pushes a chunk or stop() notifies - no timed wake-ups
+                with audio_condition:
+                    while not audio_queue and not stop_event.is_set():
+                        audio_condition.wait()
+                    if stop_event.is_set():
+                        break
+                    # Drain whatever else is ready so small client chunks share one decoder call
+                    chunks = [audio_queue.popleft()]
+                    pending = len(chunks[0])
+                    while audio_queue and pending < coalesce_bytes:
+                        chunks.append(audio_queue.popleft())
+                        pending += len(chunks[-1])
+                    if queue_depth is not None:
+                        queue_depth.set(len(audio_queue))
+                audio_chunk = chunks[0] if len(chunks) == 1 else b''.join(chunks)
 
-            while not stop_recognition_event.is_set():
                 try:
-                    # Get audio chunk with timeout
-                    audio_chunk = audio_queue.get(timeout=0.1)
-
-                    if recognizer.AcceptWaveform(audio_chunk):
-                        result = json.loads(recognizer.Result())
-                        if result.get('text'):
-                            with results_lock:
-                                latest_results.append({
-                                    'type': 'final',
-                                    'text': result.get('text', ''),
-                                    'words': result.get('result', [])
-                                })
-                            logger.debug(f"Final: {result.get('text')}")
-                    else:
-                        partial = json.loads(recognizer.PartialResult())
-                        if partial.get('partial'):
-                            with results_lock:
-                                # Update the latest partial result
-                                if latest_results and latest_results[-1].get('type') == 'partial':
-                                    latest_results[-1] = {
-                                        'type': 'partial',
-                                        'text': partial.get('partial', ''),
-                                        'words': partial.get('partial_result', [])
-                                    }
-                                else:
-                                    latest_results.append({
-                                        'type': 'partial',
-                                        'text': partial.get('partial', ''),
-                                        'words': partial.get('partial_result', [])
-                                    })
-                            logger.debug(f"Partial: {partial.get('partial')}")
-
-                except queue.Empty:
-                    continue
+                    if vad_gate is None:
+                        if _is_silent(audio_chunk):
+                            if not in_utterance:
+                                continue
+                        else:
+                            in_utterance = True
+                        decode(audio_chunk)
+                        continue
+
+                    for speech, utterance_ended in vad_gate.process(audio_chunk):
+                        if speech:
+                            decode(speech)
+                        if utterance_ended:
+                            # Commit on silence rather than waiting for Vosk's own endpointer
+                            end_utterance()
+
                 except Exception as e:
                     logger.error(f"Recognition worker error: {e}")
 
         except Exception as e:
             logger.error(f"Recognition thread error: {e}")
         finally:
-            is_recognizing = False
-            logger.info("Streaming recognition stopped")
+            self.is_recognizing = False
+            # Unregister so a crashed worker neither blocks a restart nor counts against MAX_SESSIONS
+            self.stop_event.set()
+            with sessions_lock:
+                if sessions.get(self.session_id) is self:
+                    del sessions[self.session_id]
+            if PROMETHEUS_AVAILABLE:
+                try:
+                    METRIC_QUEUE_DEPTH.remove(self.session_id)
+                except KeyError:
+                    pass
+            logger.info(f"Streaming recognition stopped for session {self.session_id}")
 
-    recognition_thread = threading.Thread(target=recognition_worker, daemon=True)
-    recognition_thread.start()
-    return True
 
+def get_session(session_id: str = DEFAULT_SESSION_ID) -> Optional[RecognitionSession]:
+    """Get the recognition session for a client, if one is running."""
+    return sessions.get(session_id)
 
-def stop_streaming_recognition():
-    """Stop streaming recognition."""
-    global is_recognizing, stop_recognition_event
 
-    stop_recognition_event.set()
-    is_recognizing = False
+def is_any_recognizing() -> bool:
+    """Whether any session is currently recognizing."""
+    return any(s.is_recognizing for s in list(sessions.values()))
+
+
+def start_streaming_recognition(sample_rate: int = 16000, grammar: Optional[list] = None,
+                                use_vad: bool = True, session_id: str = DEFAULT_SESSION_ID):
+    """Start streaming recognition for a session on its own worker thread.
+
+    Args:
+        sample_rate: Audio sample rate (default 16000)
+        grammar: Optional list of words to constrain recognition to.
+                 If None, uses current_grammar (if set) or free-form recognition.
+        use_vad: Skip silent audio before it reaches the recognizer (default True)
+        session_id: Client session to start (default session for single-client use)
+    """
+    if not is_initialized or vosk_model is None:
+        return False
+
+    # Set grammar if provided
+    if grammar is not None:
+        set_grammar(grammar)
+
+    with sessions_lock:
+        existing = sessions.get(session_id)
+        if existing is not None and existing.is_running():
+            logger.warning(f"Recognition already running for session {session_id}")
+            return True
+
+        active = sum(1 for s in sessions.values() if s.is_running())
+        if active >= MAX_SESSIONS:
+            logger.warning(f"Cannot start session {session_id}: {active} sessions already active")
+            return False
+
+        session = RecognitionSession(session_id, sample_rate, use_vad)
+        sessions[session_id] = session
+        session.thread = threading.Thread(target=session.run, name=f'vosk-session-{session_id}', daemon=True)
+        session.thread.start()
+    return True
+
 
-    if recognition_thread and recognition_thread.is_alive():
-        recognition_thread.join(timeout=2.0)
+def stop_streaming_recognition(session_id: str = DEFAULT_SESSION_ID):
+    """Stop streaming recognition for a session."""
+    with sessions_lock:
+        session = sessions.pop(session_id, None)
 
-    logger.info("Stopped streaming recognition")
+    if session is not None:
+        session.stop()
+
+    logger.info(f"Stopped streaming recognition for session {session_id}")
     return True
 
 
-def add_audio_chunk(audio_data: bytes):
-    """Add audio chunk to the recognition queue."""
-    if is_recognizing:
-        audio_queue.put(audio_data)
+def add_audio_chunk(audio_data: bytes, session_id: str = DEFAULT_SESSION_ID) -> bool:
+    """Add audio chunk to a session's recognition queue.
+
+    Returns:
+        True if the oldest queued chunk was dropped to make room (backpressure)
+    """
+    session = sessions.get(session_id)
+    if session is None or not session.is_running():
+        return False
+    return session.add_audio_chunk(audio_data)
 
 
 # Flask routes
 
+def _request_session_id() -> str:
+    """Session targeted by the current request (X-Session-Id header, else the default)."""
+    return request.headers.get('X-Session-Id') or DEFAULT_SESSION_ID
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
@@ -368,7 +997,7 @@ def health():
         'status': 'ok',
         'vosk_available': VOSK_AVAILABLE,
         'model_initialized': is_initialized,
-        'is_recognizing': is_recognizing
+        'is_recognizing': is_any_recognizing()
     })
 
 
@@ -377,15 +1006,23 @@ def status():
     """Get detailed status."""
     model_dir = get_model_dir()
     model_exists = (model_dir / MODEL_NAME).exists()
+    session = get_session(_request_session_id())
 
     return jsonify({
         'vosk_available': VOSK_AVAILABLE,
+        'vad_available': VAD_AVAILABLE,
         'model_initialized': is_initialized,
+        'gpu_requested': gpu_requested,
         'model_exists': model_exists,
         'model_path': str(model_dir / MODEL_NAME) if model_exists else None,
         'model_name': MODEL_NAME,
         'model_size_mb': MODEL_SIZE_MB,
-        'is_recognizing': is_recognizing
+        'is_recognizing': session is not None and session.is_recognizing,
+        'queued_chunks': len(session.audio_queue) if session else 0,
+        'dropped_chunks': session.dropped_chunks if session else 0,
+        'active_sessions': len(sessions),
+        'max_sessions': MAX_SESSIONS,
+        'memory_rss_mb': _process_rss_mb()
     })
 
 
@@ -409,18 +1046,23 @@ def initialize():
 def start_recognition():
     """Start streaming recognition.
 
+    Headers:
+        X-Session-Id: Optional client session; each session gets its own recognizer.
+
     Request body (JSON):
         sample_rate: int - Audio sample rate (default 16000)
         grammar: list[str] - Optional list of words to constrain recognition to.
                             Pass null/empty to clear grammar and use free-form recognition.
         use_grammar: bool - If true, uses existing grammar. If false, clears grammar.
+        use_vad: bool - If true (default), skips silent audio (WebRTC VAD, or frame energy without it).
     """
     data = request.json or {}
     sample_rate = data.get('sample_rate', 16000)
     grammar = data.get('grammar', None)
     use_grammar = data.get('use_grammar', True)
+    use_vad = data.get('use_vad', True)
 
-    if not is_initialized:
+    if not ensure_model_loaded():
         return jsonify({
             'success': False,
             'error': 'Model not initialized'
@@ -431,10 +1073,12 @@ def start_recognition():
         set_grammar(None)
         grammar = None
 
-    success = start_streaming_recognition(sample_rate, grammar)
+    session_id = _request_session_id()
+    success = start_streaming_recognition(sample_rate, grammar, use_vad, session_id)
+    session = get_session(session_id)
     return jsonify({
         'success': success,
-        'is_recognizing': is_recognizing,
+        'is_recognizing': session is not None and session.is_recognizing,
         'has_grammar': current_grammar is not None
     })
 
@@ -479,54 +1123,126 @@ def clear_grammar_endpoint():
 @app.route('/stop', methods=['POST'])
 def stop_recognition():
     """Stop streaming recognition."""
-    stop_streaming_recognition()
+    stop_streaming_recognition(_request_session_id())
     return jsonify({
         'success': True,
-        'is_recognizing': is_recognizing
+        'is_recognizing': False
     })
 
 
 @app.route('/audio', methods=['POST'])
 def receive_audio():
-    """Receive audio chunk for streaming recognition."""
-    if not is_recognizing:
+    """Receive audio chunk for streaming recognition.
+
+    Returns 204 No Content once the chunk is queued; errors are JSON with a 400.
+    """
+    session = get_session(_request_session_id())
+    if session is None or session.stop_event.is_set():
         return jsonify({
             'success': False,
             'error': 'Recognition not running'
         }), 400
 
-    # Get raw audio data
-    audio_data = request.data
+    # Read the body incrementally into one buffer and queue it as a single entry, so a
+    # large upload cannot push out its own earlier audio and drops are counted per request
+    audio_data = bytearray()
+    while True:
+        piece = request.stream.read(AUDIO_STREAM_READ_BYTES)
+        if not piece:
+            break
+        audio_data += piece
+
+    # Keep 16-bit samples whole
+    if len(audio_data) % 2:
+        del audio_data[-1]
     if not audio_data:
         return jsonify({
             'success': False,
             'error': 'No audio data'
         }), 400
 
-    add_audio_chunk(audio_data)
-    return jsonify({'success': True})
+    dropped = session.add_audio_chunk(bytes(audio_data))
+
+    # Accepted chunks get an empty 204 - no JSON envelope per chunk on the hot path
+    response = Response(status=204)
+    if dropped:
+        # Tell the client the decoder is behind so it can slow down
+        response.headers['X-Audio-Backpressure'] = 'drop'
+    return response
 
 
 @app.route('/results', methods=['GET'])
 def get_results():
     """Get recognition results and clear them."""
-    global latest_results
+    session = get_session(_request_session_id())
+    results = session.drain_results() if session else []
+    recognizing = session is not None and session.is_recognizing
 
-    with results_lock:
-        results = latest_results.copy()
-        # Keep only the last partial result
-        latest_results = [r for r in latest_results if r.get('type') == 'partial'][-1:] if latest_results else []
+    # Entries are already JSON, so the envelope is assembled without re-encoding them
+    return Response(_encode_results_envelope(results, recognizing), mimetype='application/json')
 
-    return jsonify({
-        'results': results,
-        'is_recognizing': is_recognizing
-    })
+
+def stream_results(ws):
+    """Push recognition results over a WebSocket as soon as they are published.
+
+    The session comes from the session_id query parameter (browsers cannot set
+    headers on WebSockets) or X-Session-Id. Each message has the same shape as
+    the /results response; the socket closes once the session stops.
+    """
+    session_id = request.args.get('session_id') or _request_session_id()
+    while True:
+        session = get_session(session_id)
+        if session is None or session.stop_event.is_set():
+            ws.send(_encode_results_envelope(session.drain_results() if session else [], False))
+            break
+
+        session.wait_for_results(timeout=1.0)
+        results = session.drain_results()
+        if results:
+            ws.send(_encode_results_envelope(results, session.is_recognizing))
+
+
+def stream_audio(ws):
+    """Accept raw PCM as binary WebSocket frames and push results back on the same socket.
+
+    Saves a full HTTP request per chunk compared to POST /audio. The session is
+    started with /start as usual and selected like /stream; results use the
+    /results message shape and the socket closes once the session stops.
+    """
+    session_id = request.args.get('session_id') or _request_session_id()
+    while True:
+        session = get_session(session_id)
+        if session is None or session.stop_event.is_set():
+            ws.send(_encode_results_envelope(session.drain_results() if session else [], False))
+            break
+
+        data = ws.receive(timeout=WS_RECEIVE_TIMEOUT)
+        if data and isinstance(data, (bytes, bytearray)):
+            session.add_audio_chunk(bytes(data))
+
+        results = session.drain_results()
+        if results:
+            ws.send(_encode_results_envelope(results, session.is_recognizing))
+
+
+if sock is not None:
+    sock.route('/stream')(stream_results)
+    sock.route('/ws')(stream_audio)
+
+
+def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return Response(generate_latest(), content_type=CONTENT_TYPE_LATEST)
+
+
+if PROMETHEUS_AVAILABLE:
+    app.route('/metrics', methods=['GET'])(metrics)
 
 
 @app.route('/recognize', methods=['POST'])
 def recognize_single():
     """Single-shot recognition from audio file or data."""
-    if not is_initialized:
+    if not ensure_model_loaded():
         return jsonify({
             'success': False,
             'error': 'Model not initialized'
@@ -534,22 +1250,21 @@ def recognize_single():
 
     # Handle file upload
     if 'audio' in request.files:
-        audio_file = request.files['audio']
-        # Save to temp file and process
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-            audio_file.save(tmp.name)
-            try:
-                with wave.open(tmp.name, 'rb') as wf:
-                    sample_rate = wf.getframerate()
-                    audio_data = wf.readframes(wf.getnframes())
-                result = recognize_audio_data(audio_data, sample_rate)
-            finally:
-                os.unlink(tmp.name)
+        # Parsed in memory - uploads never touch the disk
+        try:
+            audio_data, sample_rate = _read_audio_upload(request.files['audio'].read())
+        except Exception as e:
+            logger.error(f"Could not decode uploaded audio: {e}")
+            return jsonify({
+                'success': False,
+                'error': f'Unsupported audio file: {str(e) or type(e).__name__}'
+            }), 400
     else:
         # Handle raw audio data
         audio_data = request.data
         sample_rate = int(request.args.get('sample_rate', 16000))
-        result = recognize_audio_data(audio_data, sample_rate)
+
+    result = recognize_executor.submit(recognize_audio_data, audio_data, sample_rate).result()
 
     return jsonify({
         'success': 'error' not in result,
@@ -558,13 +1273,19 @@ def recognize_single():
 
 
 def main():
-    """Main entry point."""
+    """Main entry point.
+
+    /audio reads each request body from the input stream and queues it whole;
+    continuous microphone audio goes over /ws. Any other WSGI server must run
+    a single worker process, since recognition sessions live in this process.
+    """
     import argparse
 
     parser = argparse.ArgumentParser(description='Vosk Speech Recognition Service')
     parser.add_argument('--host', default='127.0.0.1', help='Host to bind to')
     parser.add_argument('--port', type=int, default=5124, help='Port to bind to')
-    parser.add_argument('--auto-init', action='store_true', help='Auto-initialize model on startup')
+    parser.add_argument('--auto-init', action='store_true',
+                        help='Load (downloading if needed) the model at startup instead of on first use')
 
     args = parser.parse_args()
 
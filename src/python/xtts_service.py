@@ -13,27 +13,61 @@ This service replaces OpenVoice for improved TTS quality and speed.
 import os
 import sys
 import json
+import queue
+import struct
 import uuid
+import hashlib
 import shutil
 import logging
 import threading
+import time
 import traceback
 import warnings
 import re
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import nullcontext
+from math import gcd
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from functools import lru_cache
+from typing import Optional, Dict, List, Any, Tuple, Iterator, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
 # Suppress warnings
 warnings.filterwarnings('ignore', category=FutureWarning)
 warnings.filterwarnings('ignore', category=UserWarning)
 
 # Flask imports
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 
+# waitress is optional - without it the service runs on Werkzeug's development server
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+# blingfire is optional - sentence splitting falls back to a punctuation regex without it
+try:
+    import blingfire
+    BLINGFIRE_AVAILABLE = True
+except ImportError:
+    BLINGFIRE_AVAILABLE = False
+
+# orjson is optional - Flask's stdlib json provider is used without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -41,34 +75,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger('XTTSService')
 
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson for faster response encoding"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# Decoder for profile files
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
 app = Flask(__name__)
 CORS(app)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
+
+# Hand file transfers to a fronting nginx/Apache; only valid behind such a proxy
+app.config['USE_X_SENDFILE'] = os.environ.get('XTTS_X_SENDFILE') == '1'
+
+
+# Emoji and pictograph ranges stripped before synthesis
+_EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"
+    "\U0001F300-\U0001F5FF"
+    "\U0001F680-\U0001F6FF"
+    "\U0001F700-\U0001F77F"
+    "\U0001F780-\U0001F7FF"
+    "\U0001F800-\U0001F8FF"
+    "\U0001F900-\U0001F9FF"
+    "\U0001FA00-\U0001FA6F"
+    "\U0001FA70-\U0001FAFF"
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "]+",
+    flags=re.UNICODE
+)
+
+# Sentence boundary: whitespace following terminal punctuation (fallback when blingfire is missing)
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
 
 
 def sanitize_text_for_tts(text: str) -> str:
     """Remove emojis and problematic characters for TTS."""
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"
-        "\U0001F300-\U0001F5FF"
-        "\U0001F680-\U0001F6FF"
-        "\U0001F700-\U0001F77F"
-        "\U0001F780-\U0001F7FF"
-        "\U0001F800-\U0001F8FF"
-        "\U0001F900-\U0001F9FF"
-        "\U0001FA00-\U0001FA6F"
-        "\U0001FA70-\U0001FAFF"
-        "\U00002702-\U000027B0"
-        "\U000024C2-\U0001F251"
-        "]+",
-        flags=re.UNICODE
-    )
-    cleaned = emoji_pattern.sub('', text)
-    try:
-        cleaned.encode('cp1252')
-    except UnicodeEncodeError:
-        cleaned = cleaned.encode('cp1252', errors='replace').decode('cp1252')
-    return cleaned
+    # Characters outside cp1252 become '?' in a single encode/decode pass
+    return _EMOJI_PATTERN.sub('', text).encode('cp1252', errors='replace').decode('cp1252')
 
 
 class Config:
@@ -88,6 +144,15 @@ class Config:
         self.device = 'cuda' if self._cuda_available() else 'cpu'
         logger.info(f"Using device: {self.device}")
 
+        # FP16 autocast on CUDA (set XTTS_FP16=0 to run in full precision)
+        self.use_fp16 = self.device == 'cuda' and os.environ.get('XTTS_FP16', '1') != '0'
+        # torch.compile the GPT decoder on CUDA (opt-in with XTTS_COMPILE=1; adds startup time)
+        self.compile_gpt = self.device == 'cuda' and os.environ.get('XTTS_COMPILE', '0') == '1'
+        # DeepSpeed fused inference kernels for the GPT decoder on CUDA (opt-in with XTTS_DEEPSPEED=1)
+        self.use_deepspeed = self.device == 'cuda' and os.environ.get('XTTS_DEEPSPEED', '0') == '1'
+        # int8 weight-only quantization of the GPT decoder (opt-in with XTTS_INT8=1; mainly for CPU)
+        self.quantize_int8 = os.environ.get('XTTS_INT8', '0') == '1'
+
     def _cuda_available(self) -> bool:
         try:
             import torch
@@ -121,11 +186,21 @@ class VoiceProfile:
 
 class ModelCache:
     """Lazy-loaded XTTS model cache"""
+
+    TOKENIZER_CACHE_SIZE = 1024  # Recently encoded (text, language) pairs kept by the tokenizer
+    # A short and a multi-sentence input, so warmup covers both decoder and vocoder shape ranges
+    WARMUP_TEXTS = (
+        "Warming up the voice model.",
+        "This longer passage warms up the decoder for multi-sentence requests. "
+        "It runs once when the model loads, so the first real synthesis starts quickly."
+    )
+
     def __init__(self):
         self._model = None
         self._lock = threading.Lock()
         self._initialized = False
         self._init_error = None
+        self._warmed_up = False
 
     def initialize(self) -> bool:
         """Initialize XTTS model"""
@@ -142,12 +217,43 @@ class ModelCache:
                 import torch
                 from TTS.api import TTS
 
+                # Skip the TorchScript profiling executor's warm-up runs on scripted submodules
+                if hasattr(torch._C, '_jit_set_profiling_executor'):
+                    torch._C._jit_set_profiling_mode(False)
+                    torch._C._jit_set_profiling_executor(False)
+
+                started = time.monotonic()
+
                 # Load XTTS v2 model (auto-downloads if not present)
                 # Model is cached in ~/.local/share/tts/ on Linux or AppData on Windows
                 self._model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(config.device)
 
+                if config.device == 'cuda':
+                    # Let any matmuls left in FP32 use TF32 tensor cores
+                    torch.backends.cuda.matmul.allow_tf32 = True
+                    torch.backends.cudnn.allow_tf32 = True
+                    torch.set_float32_matmul_precision('high')
+
+                self._cache_tokenizer()
+
+                deepspeed_active = config.use_deepspeed and self._init_deepspeed()
+
+                # DeepSpeed's kernels replace the decoder that quantization and torch.compile would change
+                if not deepspeed_active:
+                    if config.quantize_int8:
+                        self._quantize_gpt()
+                    if config.compile_gpt:
+                        self._compile_gpt()
+
+                # Pay CUDA kernel loading and allocator growth here instead of on the first request
+                if config.device == 'cuda' and not self._warmed_up:
+                    try:
+                        self._warmup()
+                    except Exception as e:
+                        logger.warning(f"XTTS warmup failed: {e}")
+
                 self._initialized = True
-                logger.info("XTTS v2 model initialized successfully")
+                logger.info(f"XTTS v2 model initialized successfully in {time.monotonic() - started:.1f}s")
                 return True
 
             except Exception as e:
@@ -156,6 +262,118 @@ class ModelCache:
                 logger.error(traceback.format_exc())
                 return False
 
+    def _cache_tokenizer(self):
+        """Memoize the XTTS text front-end
+
+        Xtts.inference tokenizes every sentence it is given, and encode()
+        runs the full normalizer (numbers, abbreviations, symbols) each time.
+        Caching it per (text, language) makes replayed study text skip that work.
+        """
+        tokenizer = self._model.synthesizer.tts_model.tokenizer
+        encode = tokenizer.encode
+
+        @lru_cache(maxsize=self.TOKENIZER_CACHE_SIZE)
+        def cached_encode(txt: str, lang: str) -> Tuple[int, ...]:
+            return tuple(encode(txt, lang))
+
+        tokenizer.encode = cached_encode
+
+    def _quantize_gpt(self):
+        """Quantize the GPT decoder's linear layers to int8 weights
+
+        Uses torchao when installed (CPU or CUDA), otherwise PyTorch's dynamic
+        quantization on CPU. The GPT-2 blocks are built from transformers'
+        Conv1D, which neither backend recognizes, so those are rewritten as
+        nn.Linear first. Failures leave the model in full precision.
+        """
+        import torch
+
+        gpt = self._model.synthesizer.tts_model.gpt
+        try:
+            _conv1d_to_linear(gpt)
+            try:
+                from torchao.quantization import quantize_, int8_weight_only
+                quantize_(gpt, int8_weight_only())
+            except ImportError:
+                if config.device != 'cpu':
+                    logger.warning("XTTS_INT8 on CUDA requires torchao, running in full precision")
+                    return
+                torch.ao.quantization.quantize_dynamic(gpt, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+            logger.info("Quantized XTTS GPT decoder to int8 weights")
+        except Exception as e:
+            logger.warning(f"int8 quantization failed, running in full precision: {e}")
+
+    def _init_deepspeed(self) -> bool:
+        """Rebuild the GPT decoder on DeepSpeed's fused inference kernels
+
+        Uses XTTS's own DeepSpeed path, which injects fused attention/MLP
+        kernels into the autoregressive decoder. Returns whether it is active.
+        """
+        from importlib.util import find_spec
+
+        if find_spec('deepspeed') is None:
+            logger.warning("XTTS_DEEPSPEED requires the deepspeed package, running without it")
+            return False
+
+        tts_model = self._model.synthesizer.tts_model
+        try:
+            tts_model.gpt.init_gpt_for_inference(kv_cache=tts_model.args.kv_cache, use_deepspeed=True)
+            tts_model.gpt.eval()
+            logger.info("XTTS GPT decoder running on DeepSpeed inference kernels")
+            return True
+        except Exception as e:
+            # DeepSpeed halves the decoder before injecting kernels; undo that for the eager path
+            tts_model.gpt.float()
+            tts_model.gpt.init_gpt_for_inference(kv_cache=tts_model.args.kv_cache)
+            tts_model.gpt.eval()
+            logger.warning(f"DeepSpeed initialization failed, running without it: {e}")
+            return False
+
+    def _compile_gpt(self):
+        """Compile the GPT decoder's per-token forward pass with CUDA graphs
+
+        Compilation happens during a warmup synthesis here rather than on the
+        first user request. Failures leave the model running uncompiled.
+        """
+        import torch
+
+        if not hasattr(torch, 'compile'):
+            logger.warning("XTTS_COMPILE requires PyTorch 2.0 or newer, running uncompiled")
+            return
+
+        gpt_inference = self._model.synthesizer.tts_model.gpt.gpt_inference
+        eager_forward = gpt_inference.forward
+        try:
+            started = time.monotonic()
+            gpt_inference.forward = torch.compile(eager_forward, mode='reduce-overhead', fullgraph=False)
+            self._warmup()
+            logger.info(f"Compiled XTTS GPT decoder in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            gpt_inference.forward = eager_forward
+            logger.warning(f"torch.compile failed, running uncompiled: {e}")
+
+    def _warmup(self):
+        """Run throwaway syntheses with neutral conditioning to trigger lazy initialization"""
+        import torch
+
+        started = time.monotonic()
+        tts_model = self._model.synthesizer.tts_model
+        # XTTS v2 conditioning shapes: 32 perceiver latents x model width, and a d-vector
+        gpt_cond_latent = torch.zeros(1, 32, tts_model.args.gpt_n_model_channels, device=config.device)
+        speaker_embedding = torch.zeros(1, tts_model.args.d_vector_dim, 1, device=config.device)
+        with torch.inference_mode(), self.autocast():
+            for text in self.WARMUP_TEXTS:
+                tts_model.inference(text, 'en', gpt_cond_latent, speaker_embedding)
+        self._warmed_up = True
+        logger.info(f"XTTS warmup complete in {time.monotonic() - started:.1f}s")
+
+    def autocast(self):
+        """Mixed-precision context for synthesis: FP16 autocast on CUDA, a no-op otherwise"""
+        if not config.use_fp16:
+            return nullcontext()
+        import torch
+        return torch.autocast(device_type='cuda', dtype=torch.float16)
+
     @property
     def model(self):
         if not self._initialized:
@@ -174,38 +392,104 @@ class ModelCache:
 model_cache = ModelCache()
 
 
+def _conv1d_to_linear(module):
+    """Replace transformers Conv1D layers under module with equivalent nn.Linear layers"""
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            # Conv1D stores its weight as (in_features, out_features)
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features, device=child.weight.device, dtype=child.weight.dtype)
+            with torch.no_grad():
+                linear.weight.copy_(child.weight.t())
+                linear.bias.copy_(child.bias)
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+
+
 class VoiceProfileStore:
-    """Manages voice profiles"""
+    """
+    Manages voice profiles
+
+    Each profile is stored as its own {profile_id}.json next to an index of
+    profile IDs, so an update rewrites one small file rather than every
+    profile. Writes go through a temp file and os.replace, so a crash
+    mid-write never corrupts existing profiles. Reads are served from the
+    in-memory dict without taking the lock. The serialized form of each
+    profile is kept alongside it and replaced whenever the profile is saved,
+    so API responses don't rebuild it per request.
+    """
+
+    INDEX_FILENAME = 'index.json'
+    LEGACY_FILENAME = 'profiles.json'  # Single-file format used before per-profile files
+
+    # Fields update_profile may change; id, name and created_at are fixed at creation
+    _ALLOWED_UPDATE_KEYS = frozenset({'state', 'speaker_wav', 'error', 'progress', 'audio_samples'})
 
     def __init__(self):
         self._profiles: Dict[str, VoiceProfile] = {}
+        self._profile_dicts: Dict[str, Dict[str, Any]] = {}
         self._lock = threading.Lock()
         self._load_profiles()
 
+    @staticmethod
+    def _write_json(path: Path, data: Any):
+        """Atomically replace path with compact JSON"""
+        tmp_path = path.with_suffix('.json.tmp')
+        if ORJSON_AVAILABLE:
+            tmp_path.write_bytes(orjson.dumps(data))
+        else:
+            tmp_path.write_text(json.dumps(data, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def _profile_path(self, profile_id: str) -> Path:
+        return config.profiles_dir / f"{profile_id}.json"
+
     def _load_profiles(self):
-        """Load existing profiles from disk"""
-        profiles_file = config.profiles_dir / 'profiles.json'
-        if profiles_file.exists():
-            try:
-                with open(profiles_file, 'r') as f:
-                    data = json.load(f)
-                    for profile_data in data.get('profiles', []):
+        """Load existing profiles from disk, migrating the legacy profiles.json"""
+        index_file = config.profiles_dir / self.INDEX_FILENAME
+        legacy_file = config.profiles_dir / self.LEGACY_FILENAME
+        try:
+            if index_file.exists():
+                for profile_id in json_loads(index_file.read_bytes()):
+                    try:
+                        profile_data = json_loads(self._profile_path(profile_id).read_bytes())
                         profile = VoiceProfile(**profile_data)
-                        self._profiles[profile.id] = profile
-                logger.info(f"Loaded {len(self._profiles)} voice profiles")
-            except Exception as e:
-                logger.error(f"Failed to load profiles: {e}")
+                        self._profiles[profile_id] = profile
+                        self._profile_dicts[profile_id] = asdict(profile)
+                    except Exception as e:
+                        logger.error(f"Failed to load profile {profile_id}: {e}")
+            elif legacy_file.exists():
+                with open(legacy_file, 'r') as f:
+                    data = json.load(f)
+                for profile_data in data.get('profiles', []):
+                    profile = VoiceProfile(**profile_data)
+                    self._profiles[profile.id] = profile
+                    self._save_profile(profile)
+                self._save_index()
+                logger.info(f"Migrated {len(self._profiles)} profiles from {self.LEGACY_FILENAME}")
+            logger.info(f"Loaded {len(self._profiles)} voice profiles")
+        except Exception as e:
+            logger.error(f"Failed to load profiles: {e}")
 
-    def _save_profiles(self):
-        """Save profiles to disk"""
-        profiles_file = config.profiles_dir / 'profiles.json'
+    def _save_profile(self, profile: VoiceProfile):
+        """Refresh a profile's serialized form and save it to disk"""
+        profile_dict = asdict(profile)
+        self._profile_dicts[profile.id] = profile_dict
         try:
-            with open(profiles_file, 'w') as f:
-                json.dump({
-                    'profiles': [asdict(p) for p in self._profiles.values()]
-                }, f, indent=2)
+            self._write_json(self._profile_path(profile.id), profile_dict)
         except Exception as e:
-            logger.error(f"Failed to save profiles: {e}")
+            logger.error(f"Failed to save profile {profile.id}: {e}")
+
+    def _save_index(self):
+        """Save the list of profile IDs to disk"""
+        try:
+            self._write_json(config.profiles_dir / self.INDEX_FILENAME, list(self._profiles))
+        except Exception as e:
+            logger.error(f"Failed to save profile index: {e}")
 
     def create_profile(self, name: str, audio_samples: List[str]) -> VoiceProfile:
         """Create a new voice profile"""
@@ -220,22 +504,30 @@ class VoiceProfileStore:
                 progress=0
             )
             self._profiles[profile_id] = profile
-            self._save_profiles()
+            self._save_profile(profile)
+            self._save_index()
             return profile
 
     def get_profile(self, profile_id: str) -> Optional[VoiceProfile]:
         """Get a voice profile by ID"""
         return self._profiles.get(profile_id)
 
+    def get_profile_dict(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Get the serialized form of a voice profile (treat as read-only)"""
+        return self._profile_dicts.get(profile_id)
+
     def update_profile(self, profile_id: str, **kwargs) -> Optional[VoiceProfile]:
         """Update a voice profile"""
+        unknown_keys = kwargs.keys() - self._ALLOWED_UPDATE_KEYS
+        if unknown_keys:
+            raise ValueError(f"Cannot update profile fields: {', '.join(sorted(unknown_keys))}")
+
         with self._lock:
             profile = self._profiles.get(profile_id)
             if profile:
                 for key, value in kwargs.items():
-                    if hasattr(profile, key):
-                        setattr(profile, key, value)
-                self._save_profiles()
+                    setattr(profile, key, value)
+                self._save_profile(profile)
             return profile
 
     def delete_profile(self, profile_id: str) -> bool:
@@ -251,7 +543,9 @@ class VoiceProfileStore:
                 if profile_dir.exists():
                     shutil.rmtree(profile_dir)
                 del self._profiles[profile_id]
-                self._save_profiles()
+                self._profile_dicts.pop(profile_id, None)
+                self._save_index()
+                self._profile_path(profile_id).unlink(missing_ok=True)
                 return True
             return False
 
@@ -259,36 +553,83 @@ class VoiceProfileStore:
         """List all profiles"""
         return list(self._profiles.values())
 
+    def list_profile_dicts(self) -> List[Dict[str, Any]]:
+        """List the serialized form of all profiles (treat as read-only)"""
+        return list(self._profile_dicts.values())
+
 
 profile_store = VoiceProfileStore()
 
 
+def _load_audio(path: str) -> Tuple[np.ndarray, int]:
+    """
+    Decode an audio file to float32 samples in [-1, 1]
+
+    libsndfile decodes WAV/FLAC/OGG/MP3 in-process; other containers (such as
+    the WebM recordings made by the app) fall back to ffmpeg through pydub.
+
+    Returns:
+        Tuple of (samples shaped (frames, channels), sample_rate)
+    """
+    try:
+        return sf.read(path, dtype='float32', always_2d=True)
+    except RuntimeError:
+        from pydub import AudioSegment
+
+        segment = AudioSegment.from_file(path)
+        samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+        samples /= float(1 << (8 * segment.sample_width - 1))
+        return samples.reshape(-1, segment.channels), segment.frame_rate
+
+
+def _dbfs(samples: np.ndarray) -> float:
+    """RMS level of float samples relative to full scale (-inf for digital silence)"""
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64)))) if samples.size else 0.0
+    return 20 * np.log10(rms) if rms > 0 else float('-inf')
+
+
 class ProfileProcessor:
     """Processes voice profiles (prepares reference audio)"""
 
+    REFERENCE_SAMPLE_RATE = 22050  # XTTS preferred
+    REFERENCE_TARGET_DBFS = -20.0
+    REFERENCE_MAX_SECONDS = 30
+    REFERENCE_GAP_SECONDS = 0.3  # Silence between combined clips
+    MAX_WORKERS = min(4, os.cpu_count() or 1)  # Profiles processed concurrently
+
     def __init__(self):
-        self._current_task: Optional[str] = None
+        self._active: Set[str] = set()
         self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.MAX_WORKERS)
 
     def start_processing(self, profile_id: str, audio_paths: List[str]):
         """Start processing a voice profile"""
         with self._lock:
-            if self._current_task:
-                return False, "Another task is in progress"
-            self._current_task = profile_id
+            if profile_id in self._active:
+                return False, "Profile is already being processed"
+            self._active.add(profile_id)
 
+        # Daemon threads (not a pool) so an in-progress profile never blocks shutdown
         thread = threading.Thread(
-            target=self._process_profile,
+            target=self._process_with_slot,
             args=(profile_id, audio_paths),
+            name=f'xtts-profile-{profile_id}',
             daemon=True
         )
         thread.start()
         return True, "Processing started"
 
+    def _process_with_slot(self, profile_id: str, audio_paths: List[str]):
+        """Wait for one of MAX_WORKERS slots, then process the profile"""
+        with self._slots:
+            self._process_profile(profile_id, audio_paths)
+
     def _process_profile(self, profile_id: str, audio_paths: List[str]):
         """Background profile processing task"""
         try:
             logger.info(f"Processing voice profile {profile_id}")
+            # Latents computed from the previous reference audio are stale
+            tts_synthesizer.evict_latents(profile_id)
             profile_store.update_profile(
                 profile_id,
                 state=VoiceProfileState.PROCESSING.value,
@@ -315,6 +656,15 @@ class ProfileProcessor:
 
             logger.info(f"Voice profile {profile_id} ready")
 
+            # Encode the reference audio now so the first synthesis doesn't pay for it
+            if model_cache.is_initialized:
+                try:
+                    # On the synthesis worker, which owns every model call
+                    profile = profile_store.get_profile(profile_id)
+                    synthesis_scheduler.submit_job(lambda: tts_synthesizer.get_latents(profile)).result()
+                except Exception as e:
+                    logger.warning(f"Failed to precompute latents for {profile_id}: {e}")
+
         except Exception as e:
             logger.error(f"Profile processing failed for {profile_id}: {e}")
             logger.error(traceback.format_exc())
@@ -326,105 +676,385 @@ class ProfileProcessor:
             )
         finally:
             with self._lock:
-                self._current_task = None
+                self._active.discard(profile_id)
 
     def _prepare_reference_audio(self, profile_id: str, audio_paths: List[str]) -> str:
         """Prepare reference audio for XTTS"""
-        from pydub import AudioSegment
-
         profile_dir = config.profiles_dir / profile_id
         profile_dir.mkdir(parents=True, exist_ok=True)
 
+        sample_rate = self.REFERENCE_SAMPLE_RATE
+        silence = np.zeros(int(self.REFERENCE_GAP_SECONDS * sample_rate), dtype=np.float32)
+
         # XTTS works best with 6-30 seconds of clear speech
         # Combine multiple samples if provided
-        if len(audio_paths) == 1:
-            audio = AudioSegment.from_file(audio_paths[0])
-        else:
-            combined = AudioSegment.empty()
-            silence = AudioSegment.silent(duration=300)  # 300ms between clips
-
-            for i, path in enumerate(audio_paths):
-                try:
-                    audio = AudioSegment.from_file(path)
-                    if i > 0:
-                        combined += silence
-                    combined += audio
-                except Exception as e:
-                    logger.warning(f"Failed to process audio file {path}: {e}")
-
-            audio = combined
+        clips = []
+        for path in audio_paths:
+            try:
+                samples, source_rate = _load_audio(path)
+            except Exception as e:
+                if len(audio_paths) == 1:
+                    raise
+                logger.warning(f"Failed to process audio file {path}: {e}")
+                continue
+
+            # Normalize audio for XTTS
+            # - Mono channel
+            # - 22050 Hz sample rate (XTTS preferred)
+            mono = samples.mean(axis=1)
+            if source_rate != sample_rate:
+                divisor = gcd(sample_rate, source_rate)
+                mono = resample_poly(mono, sample_rate // divisor, source_rate // divisor).astype(np.float32)
+
+            if clips:
+                clips.append(silence)
+            clips.append(mono)
+
+        if not clips:
+            raise ValueError("None of the audio samples could be read")
 
-        # Normalize audio for XTTS
-        # - Mono channel
-        # - 22050 Hz sample rate (XTTS preferred)
-        # - Normalize volume
-        audio = audio.set_channels(1)
-        audio = audio.set_frame_rate(22050)
+        # Trim to optimal length (6-30 seconds)
+        audio = np.concatenate(clips)[:self.REFERENCE_MAX_SECONDS * sample_rate]
 
         # Normalize to -20 dBFS for consistent volume
-        target_dBFS = -20.0
-        change_in_dBFS = target_dBFS - audio.dBFS
-        audio = audio.apply_gain(change_in_dBFS)
-
-        # Trim to optimal length (6-30 seconds)
-        max_duration_ms = 30000
-        if len(audio) > max_duration_ms:
-            audio = audio[:max_duration_ms]
+        level = _dbfs(audio)
+        if np.isfinite(level):
+            audio *= 10 ** ((self.REFERENCE_TARGET_DBFS - level) / 20)
+        np.clip(audio, -1.0, 1.0, out=audio)
 
         output_path = profile_dir / 'speaker_reference.wav'
-        audio.export(str(output_path), format='wav')
+        sf.write(str(output_path), audio, sample_rate, subtype='PCM_16')
 
         return str(output_path)
 
     def _validate_audio(self, audio_path: str):
         """Validate reference audio"""
-        from pydub import AudioSegment
-
-        audio = AudioSegment.from_file(audio_path)
+        samples, sample_rate = sf.read(audio_path, dtype='float32')
 
         # Check for silent/corrupt audio
-        if audio.max == 0:
+        if not np.any(samples):
             raise ValueError("Audio file appears to be silent or corrupted")
 
         # Minimum duration
-        if audio.duration_seconds < 3:
-            raise ValueError(f"Audio too short ({audio.duration_seconds:.1f}s). Minimum 3 seconds required.")
+        duration = len(samples) / sample_rate
+        if duration < 3:
+            raise ValueError(f"Audio too short ({duration:.1f}s). Minimum 3 seconds required.")
 
         # Warn if very quiet
-        if audio.dBFS < -50:
-            logger.warning(f"Audio is very quiet ({audio.dBFS:.1f} dBFS)")
+        level = _dbfs(samples)
+        if level < -50:
+            logger.warning(f"Audio is very quiet ({level:.1f} dBFS)")
 
 
 profile_processor = ProfileProcessor()
 
+# Generated audio is named output_<hex8>.wav, combined_<hex8>.wav or cached_<hex24>.wav (content-addressed)
+_AUDIO_FILENAME_PATTERN = re.compile(r'^(?:(?:output|combined)_[0-9a-f]{8}|cached_[0-9a-f]{24})\.wav$')
+
+OUTPUT_DIR_MAX_BYTES = 2 * 1024 ** 3  # Generated audio kept before the least recently used files are removed
+OUTPUT_EVICTION_INTERVAL_SECONDS = 600
+
+
+@lru_cache(maxsize=4096)
+def _audio_path_for(filename: str) -> Optional[str]:
+    """Map a generated audio filename to its path, or None if the name isn't one we produce"""
+    if not _AUDIO_FILENAME_PATTERN.match(filename):
+        return None
+    return str(config.output_dir / filename)
+
+
+def _resolve_audio_path(filename: str) -> Optional[str]:
+    """Resolve a generated audio filename to its path, or None if unknown.
+
+    Only names produced by the synthesizer are accepted, so path traversal is
+    rejected before touching the filesystem. Existence is checked on every
+    call, so files removed by anything (eviction or otherwise) return None.
+    """
+    audio_path = _audio_path_for(filename)
+    return audio_path if audio_path and os.path.isfile(audio_path) else None
+
+
+def _trim_output_dir(max_bytes: int = OUTPUT_DIR_MAX_BYTES) -> int:
+    """
+    Delete the least recently used generated audio until the output directory fits max_bytes
+
+    Cache hits refresh a file's mtime, so mtime order is least-recently-used order.
+
+    Returns:
+        Number of files removed
+    """
+    files = []
+    total_bytes = 0
+    with os.scandir(config.output_dir) as entries:
+        for entry in entries:
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+
+    removed = 0
+    for _, size, path in sorted(files):
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_bytes -= size
+        removed += 1
+
+    if removed:
+        logger.info(f"Removed {removed} old audio files from {config.output_dir}")
+    return removed
+
+
+def _output_eviction_loop():
+    """Keep the output directory under OUTPUT_DIR_MAX_BYTES for the life of the process"""
+    while True:
+        try:
+            _trim_output_dir()
+        except Exception as e:
+            logger.warning(f"Output eviction failed: {e}")
+        time.sleep(OUTPUT_EVICTION_INTERVAL_SECONDS)
+
+
+def _float_to_pcm16(wav: np.ndarray) -> np.ndarray:
+    """Peak-normalize a float waveform to 16-bit PCM (as the TTS API does when saving)."""
+    wav = np.asarray(wav, dtype=np.float32)
+    return (wav * (32767 / max(0.01, float(np.max(np.abs(wav)))))).astype(np.int16)
+
+
+def _streaming_wav_header(sample_rate: int, channels: int = 1, bits_per_sample: int = 16) -> bytes:
+    """WAV header for a PCM stream of unknown length (RIFF and data sizes set to the maximum)"""
+    block_align = channels * bits_per_sample // 8
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 0xFFFFFFFF, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, bits_per_sample,
+        b'data', 0xFFFFFFFF
+    )
+
 
 class TTSSynthesizer:
     """Text-to-speech synthesis with XTTS v2"""
 
     MAX_CHUNK_CHARS = 250  # XTTS handles shorter chunks better
+    MIN_CHUNK_CHARS = 120  # Final chunk is topped up to this so long text doesn't end on a fragment
+    CHUNK_PAUSE_MS = 150  # Silence inserted between chunks of long text
+    STREAM_CHUNK_TOKENS = 20  # GPT tokens decoded per streamed audio chunk
+    STREAM_OVERLAP_SAMPLES = 1024  # Cross-fade between streamed chunks
+    LATENTS_FILENAME = 'latents.pt'  # Conditioning tensors persisted next to the reference audio
+
+    def __init__(self):
+        # profile_id -> (gpt_cond_latent, speaker_embedding), kept on the CPU
+        self._latent_cache: Dict[str, tuple] = {}
+        self._latent_lock = threading.Lock()
+
+    def _get_ready_profile(self, profile_id: str) -> VoiceProfile:
+        """Look up a profile that is ready for synthesis, raising ValueError otherwise"""
+        profile = profile_store.get_profile(profile_id)
+        if not profile:
+            raise ValueError(f"Profile not found: {profile_id}")
+
+        if profile.state != VoiceProfileState.READY.value:
+            raise ValueError(f"Profile not ready: {profile.state}")
+
+        if not profile.speaker_wav or not os.path.exists(profile.speaker_wav):
+            raise ValueError("Profile reference audio not found")
+
+        return profile
+
+    def get_latents(self, profile: VoiceProfile) -> tuple:
+        """
+        Get a profile's conditioning latents, computing them only on first use
+
+        Latents are cached in memory and saved to the profile directory, so the
+        reference audio is encoded once per profile rather than once per request.
+
+        Returns:
+            Tuple of (gpt_cond_latent, speaker_embedding)
+        """
+        latents = self._latent_cache.get(profile.id)
+        if latents is not None:
+            return latents
+
+        import torch
+
+        with self._latent_lock:
+            latents = self._latent_cache.get(profile.id)
+            if latents is not None:
+                return latents
+
+            latents_path = config.profiles_dir / profile.id / self.LATENTS_FILENAME
+            if latents_path.exists():
+                try:
+                    latents = tuple(torch.load(str(latents_path), map_location='cpu'))
+                except Exception as e:
+                    logger.warning(f"Failed to load cached latents for {profile.id}: {e}")
+
+            if latents is None:
+                gpt_cond_latent, speaker_embedding = self._conditioning_latents(profile)
+                latents = (gpt_cond_latent.cpu(), speaker_embedding.cpu())
+                try:
+                    torch.save(latents, str(latents_path))
+                except Exception as e:
+                    logger.warning(f"Failed to save latents for {profile.id}: {e}")
+
+            self._latent_cache[profile.id] = latents
+            return latents
+
+    def evict_latents(self, profile_id: str):
+        """Forget a profile's cached latents (after its reference audio changes or it is deleted)"""
+        with self._latent_lock:
+            self._latent_cache.pop(profile_id, None)
+            latents_path = config.profiles_dir / profile_id / self.LATENTS_FILENAME
+            try:
+                latents_path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to remove cached latents for {profile_id}: {e}")
+
+    def _conditioning_latents(self, profile: VoiceProfile):
+        """Compute the GPT conditioning latent and speaker embedding for a profile
+
+        Uses the same reference settings as the high-level TTS API.
+        """
+        tts_model = model_cache.model.synthesizer.tts_model
+        model_config = tts_model.config
+        return tts_model.get_conditioning_latents(
+            audio_path=profile.speaker_wav,
+            gpt_cond_len=model_config.gpt_cond_len,
+            gpt_cond_chunk_len=model_config.gpt_cond_chunk_len,
+            max_ref_length=model_config.max_ref_len,
+            sound_norm_refs=model_config.sound_norm_refs
+        )
+
+    def _generate_waveforms(
+        self,
+        chunks: List[str],
+        profile: VoiceProfile,
+        language: str,
+        speed: float
+    ) -> List[np.ndarray]:
+        """
+        Synthesize text chunks with the profile's conditioning computed once
+
+        Args:
+            chunks: Sanitized text chunks to synthesize, in order
+            profile: Ready voice profile
+            language: Language code
+            speed: Speech speed (0.5-2.0)
+
+        Returns:
+            Float waveforms at the model's output sample rate; chunks that fail are skipped
+        """
+        import torch
+
+        tts_model = model_cache.model.synthesizer.tts_model
+        model_config = tts_model.config
+        gpt_cond_latent, speaker_embedding = self.get_latents(profile)
+
+        waveforms = []
+        with torch.inference_mode(), model_cache.autocast():
+            for i, chunk in enumerate(chunks):
+                logger.info(f"Synthesizing chunk {i+1}/{len(chunks)}: {len(chunk)} chars")
+                try:
+                    output = tts_model.inference(
+                        chunk,
+                        language,
+                        gpt_cond_latent,
+                        speaker_embedding,
+                        temperature=model_config.temperature,
+                        length_penalty=model_config.length_penalty,
+                        repetition_penalty=model_config.repetition_penalty,
+                        top_k=model_config.top_k,
+                        top_p=model_config.top_p,
+                        speed=speed,
+                        enable_text_splitting=True
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to synthesize chunk {i+1}, skipping: {e}")
+                    continue
+                waveforms.append(np.asarray(output['wav'], dtype=np.float32))
+
+        return waveforms
 
     def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences"""
-        sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+        """Split text into sentences (blingfire keeps abbreviations like "Dr." and "e.g." intact)"""
+        if BLINGFIRE_AVAILABLE:
+            sentences = blingfire.text_to_sentences(text.strip()).split('\n')
+        else:
+            sentences = _SENTENCE_SPLIT.split(text.strip())
         return [s.strip() for s in sentences if s.strip()]
 
     def _chunk_text(self, text: str) -> List[str]:
         """Split text into manageable chunks"""
         sentences = self._split_into_sentences(text)
-        chunks = []
-        current_chunk = ""
+        chunks: List[List[str]] = []
+        length = 0
 
         for sentence in sentences:
-            if len(current_chunk) + len(sentence) + 1 > self.MAX_CHUNK_CHARS and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = sentence
+            if chunks and length + len(sentence) + 1 <= self.MAX_CHUNK_CHARS:
+                chunks[-1].append(sentence)
+                length += len(sentence) + 1
             else:
-                current_chunk = f"{current_chunk} {sentence}".strip() if current_chunk else sentence
+                chunks.append([sentence])
+                length = len(sentence)
 
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        # Move sentences from the previous chunk into a short final one
+        if len(chunks) > 1:
+            previous, last = chunks[-2], chunks[-1]
+            while (len(previous) > 1 and length < self.MIN_CHUNK_CHARS
+                   and length + len(previous[-1]) + 1 <= self.MAX_CHUNK_CHARS):
+                sentence = previous.pop()
+                last.insert(0, sentence)
+                length += len(sentence) + 1
 
-        return chunks if chunks else [text]
+        return [' '.join(chunk) for chunk in chunks] if chunks else [text]
+
+    def _cached_output_path(
+        self,
+        sanitized_text: str,
+        profile: VoiceProfile,
+        language: str,
+        speed: float
+    ) -> Path:
+        """Content-addressed output path for a synthesis request"""
+        # The reference mtime changes when the voice is reprocessed,
+        # and speed is normalized so 1, 1.0 and "1.0" share a file
+        reference_mtime = os.stat(profile.speaker_wav).st_mtime_ns
+        cache_key = hashlib.blake2b(
+            f"{sanitized_text}|{profile.id}|{reference_mtime}|{language}|{float(speed):.6f}".encode('utf-8'),
+            digest_size=12
+        ).hexdigest()
+        return config.output_dir / f'cached_{cache_key}.wav'
+
+    def find_cached(
+        self,
+        text: str,
+        profile_id: str,
+        language: str = 'en',
+        speed: float = 1.0
+    ) -> Optional[str]:
+        """
+        Look up a previously synthesized output for a request
+
+        Needs neither the model nor the synthesis worker, so request threads can
+        answer repeats without queueing behind running synthesis.
+
+        Returns:
+            Path to the cached audio file, or None if it must be synthesized
+        """
+        try:
+            profile = self._get_ready_profile(profile_id)
+            output_path = self._cached_output_path(sanitize_text_for_tts(text), profile, language, speed)
+            if not output_path.exists():
+                return None
+            os.utime(output_path)  # Mark as recently used for eviction
+            return str(output_path)
+        except (ValueError, OSError):
+            return None
 
     def synthesize(
         self,
@@ -436,6 +1066,9 @@ class TTSSynthesizer:
         """
         Synthesize speech with voice cloning
 
+        Outputs are named by a hash of the request and the profile's reference
+        audio, so repeating a request returns the existing file without synthesis.
+
         Args:
             text: Text to synthesize
             profile_id: Voice profile ID
@@ -447,36 +1080,36 @@ class TTSSynthesizer:
         """
         try:
             # Get voice profile
-            profile = profile_store.get_profile(profile_id)
-            if not profile:
-                raise ValueError(f"Profile not found: {profile_id}")
+            profile = self._get_ready_profile(profile_id)
 
-            if profile.state != VoiceProfileState.READY.value:
-                raise ValueError(f"Profile not ready: {profile.state}")
+            # Sanitize text
+            sanitized_text = sanitize_text_for_tts(text)
 
-            if not profile.speaker_wav or not os.path.exists(profile.speaker_wav):
-                raise ValueError("Profile reference audio not found")
+            # Checked again here in case an identical queued request has written the file since
+            output_path = self._cached_output_path(sanitized_text, profile, language, speed)
+            if output_path.exists():
+                os.utime(output_path)  # Mark as recently used for eviction
+                return str(output_path)
 
             # Initialize model
             if not model_cache.initialize():
                 raise Exception(model_cache.init_error)
 
-            # Sanitize text
-            sanitized_text = sanitize_text_for_tts(text)
-
-            # Generate output path
-            output_id = uuid.uuid4().hex[:8]
-            output_path = config.output_dir / f'output_{output_id}.wav'
-
-            # Synthesize with XTTS
-            # XTTS uses the reference audio directly for zero-shot cloning
-            model_cache.model.tts_to_file(
-                text=sanitized_text,
-                file_path=str(output_path),
-                speaker_wav=profile.speaker_wav,
-                language=language,
-                speed=speed
+            # Synthesize with XTTS using the profile's cached conditioning latents
+            waveforms = self._generate_waveforms([sanitized_text], profile, language, speed)
+            if not waveforms:
+                raise Exception("Synthesis produced no audio")
+
+            # Write under a temporary name so a cache hit never sees a partial file
+            tmp_path = output_path.with_suffix('.wav.tmp')
+            sf.write(
+                str(tmp_path),
+                _float_to_pcm16(waveforms[0]),
+                model_cache.model.synthesizer.output_sample_rate,
+                subtype='PCM_16',
+                format='WAV'
             )
+            os.replace(tmp_path, output_path)
 
             return str(output_path)
 
@@ -485,6 +1118,61 @@ class TTSSynthesizer:
             logger.error(traceback.format_exc())
             return None
 
+    def synthesize_stream(
+        self,
+        text: str,
+        profile_id: str,
+        language: str = 'en',
+        speed: float = 1.0
+    ) -> Iterator[bytes]:
+        """
+        Synthesize speech incrementally as the GPT decoder produces tokens
+
+        The profile and model are checked before this returns, so errors surface
+        before any audio is sent.
+
+        Args:
+            text: Text to synthesize
+            profile_id: Voice profile ID
+            language: Language code
+            speed: Speech speed (0.5-2.0)
+
+        Returns:
+            Iterator of 16-bit mono PCM chunks at the model's output sample rate
+        """
+        profile = self._get_ready_profile(profile_id)
+        if not model_cache.initialize():
+            raise Exception(model_cache.init_error)
+
+        gpt_cond_latent, speaker_embedding = self.get_latents(profile)
+        return self._stream_pcm(sanitize_text_for_tts(text), language, speed, gpt_cond_latent, speaker_embedding)
+
+    def _stream_pcm(self, text: str, language: str, speed: float, gpt_cond_latent, speaker_embedding) -> Iterator[bytes]:
+        """Yield PCM chunks from XTTS streaming inference"""
+        import torch
+
+        tts_model = model_cache.model.synthesizer.tts_model
+        model_config = tts_model.config
+        with torch.inference_mode(), model_cache.autocast():
+            for wav_chunk in tts_model.inference_stream(
+                text,
+                language,
+                gpt_cond_latent,
+                speaker_embedding,
+                stream_chunk_size=self.STREAM_CHUNK_TOKENS,
+                overlap_wav_len=self.STREAM_OVERLAP_SAMPLES,
+                temperature=model_config.temperature,
+                length_penalty=model_config.length_penalty,
+                repetition_penalty=model_config.repetition_penalty,
+                top_k=model_config.top_k,
+                top_p=model_config.top_p,
+                speed=speed,
+                enable_text_splitting=True
+            ):
+                # Chunks can't be peak-normalized without the whole utterance, so clip instead
+                samples = np.asarray(wav_chunk.cpu().numpy(), dtype=np.float32)
+                yield (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
     def synthesize_long(
         self,
         text: str,
@@ -493,8 +1181,6 @@ class TTSSynthesizer:
         speed: float = 1.0
     ) -> Optional[Dict[str, Any]]:
         """Synthesize long text with automatic chunking"""
-        from pydub import AudioSegment
-
         try:
             chunks = self._chunk_text(text)
             logger.info(f"Synthesizing {len(chunks)} chunks for long text ({len(text)} chars)")
@@ -502,57 +1188,40 @@ class TTSSynthesizer:
             if len(chunks) == 1:
                 audio_path = self.synthesize(text, profile_id, language, speed)
                 if audio_path:
-                    audio = AudioSegment.from_wav(audio_path)
                     return {
                         'audio_path': audio_path,
-                        'duration': len(audio) / 1000.0,
+                        'duration': sf.info(audio_path).duration,
                         'chunks': 1
                     }
                 return None
 
-            # Synthesize each chunk
-            audio_segments = []
-            temp_files = []
-
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Synthesizing chunk {i+1}/{len(chunks)}: {len(chunk)} chars")
-                chunk_path = self.synthesize(chunk, profile_id, language, speed)
-
-                if not chunk_path:
-                    logger.warning(f"Failed to synthesize chunk {i+1}, skipping")
-                    continue
-
-                temp_files.append(chunk_path)
-                segment = AudioSegment.from_wav(chunk_path)
-                audio_segments.append(segment)
-
-                # Small pause between chunks
-                silence = AudioSegment.silent(duration=150)
-                audio_segments.append(silence)
+            profile = self._get_ready_profile(profile_id)
+            if not model_cache.initialize():
+                raise Exception(model_cache.init_error)
 
-            if not audio_segments:
+            # Synthesize all chunks in memory, encoding the reference audio only once
+            sanitized_chunks = [sanitize_text_for_tts(chunk) for chunk in chunks]
+            waveforms = self._generate_waveforms(sanitized_chunks, profile, language, speed)
+            if not waveforms:
                 raise Exception("All chunks failed to synthesize")
 
-            # Concatenate
-            combined = audio_segments[0]
-            for segment in audio_segments[1:]:
-                combined += segment
+            # Each chunk followed by a small pause, joined with a single allocation
+            sample_rate = model_cache.model.synthesizer.output_sample_rate
+            silence = np.zeros(sample_rate * self.CHUNK_PAUSE_MS // 1000, dtype=np.int16)
+            pieces = []
+            for waveform in waveforms:
+                pieces.append(_float_to_pcm16(waveform))
+                pieces.append(silence)
+            combined = np.concatenate(pieces)
 
             # Export
             output_id = uuid.uuid4().hex[:8]
             output_path = config.output_dir / f'combined_{output_id}.wav'
-            combined.export(str(output_path), format='wav')
-
-            # Cleanup temp files
-            for temp_file in temp_files:
-                try:
-                    os.remove(temp_file)
-                except OSError as e:
-                    logger.debug(f"Failed to cleanup temp file {temp_file}: {e}")
+            sf.write(str(output_path), combined, sample_rate, subtype='PCM_16')
 
             return {
                 'audio_path': str(output_path),
-                'duration': len(combined) / 1000.0,
+                'duration': len(combined) / sample_rate,
                 'chunks': len(chunks)
             }
 
@@ -565,6 +1234,180 @@ class TTSSynthesizer:
 tts_synthesizer = TTSSynthesizer()
 
 
+class SynthesisScheduler:
+    """
+    Process-wide synthesis queue served by a single worker thread
+
+    Every model call (short, long and streaming synthesis, latent precompute)
+    runs as a job on this worker, so concurrent HTTP requests never contend
+    for the model. Jobs arriving within BATCH_WINDOW_SECONDS of each other are
+    collected (up to MAX_BATCH) and run grouped by (profile_id, language,
+    speed), so requests sharing a voice run back to back on warm conditioning
+    latents. Within a batch, shorter texts run first, which minimizes the mean wait.
+    """
+
+    MAX_BATCH = 8
+    BATCH_WINDOW_SECONDS = 0.02
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit_job(self, job, sort_key: int = 0, group_key: Optional[tuple] = None) -> Future:
+        """
+        Queue a callable to run on the synthesis worker
+
+        Args:
+            job: Callable taking no arguments
+            sort_key: Jobs with smaller keys run first within a batch
+            group_key: Jobs sharing a key run back to back
+
+        Returns:
+            Future resolving to the job's return value
+        """
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((sort_key, group_key, job, future))
+        return future
+
+    def submit(self, text: str, profile_id: str, language: str = 'en', speed: float = 1.0) -> Future:
+        """
+        Queue a synthesis request
+
+        Returns:
+            Future resolving to the generated audio path, or None on failure
+        """
+        return self.submit_job(
+            lambda: tts_synthesizer.synthesize(text, profile_id, language, speed),
+            len(text),
+            (profile_id, language, speed)
+        )
+
+    def submit_long(self, text: str, profile_id: str, language: str = 'en', speed: float = 1.0) -> Future:
+        """
+        Queue a long-text synthesis request
+
+        Returns:
+            Future resolving to the synthesize_long result, or None on failure
+        """
+        return self.submit_job(
+            lambda: tts_synthesizer.synthesize_long(text, profile_id, language, speed),
+            len(text),
+            (profile_id, language, speed)
+        )
+
+    def submit_stream(
+        self,
+        text: str,
+        profile_id: str,
+        language: str = 'en',
+        speed: float = 1.0,
+        timeout: Optional[float] = None
+    ) -> Iterator[bytes]:
+        """
+        Queue a streaming synthesis request
+
+        The worker produces PCM chunks and hands them over through a queue.
+        Profile and model errors are raised here, before any audio is returned;
+        closing the returned iterator stops the worker at its next chunk.
+
+        Returns:
+            Iterator of 16-bit mono PCM chunks at the model's output sample rate
+        """
+        chunks: queue.Queue = queue.Queue()
+        closed = threading.Event()
+
+        def produce():
+            try:
+                for chunk in tts_synthesizer.synthesize_stream(text, profile_id, language, speed):
+                    if closed.is_set():
+                        return
+                    chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+                return
+            chunks.put(None)
+
+        future = self.submit_job(produce, len(text), (profile_id, language, speed))
+        try:
+            first = chunks.get(timeout=timeout)
+        except queue.Empty:
+            future.cancel()
+            closed.set()
+            raise FutureTimeoutError()
+        if isinstance(first, Exception):
+            raise first
+
+        def drain() -> Iterator[bytes]:
+            try:
+                item = first
+                while item is not None:
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+                    item = chunks.get()
+            finally:
+                closed.set()
+
+        return drain()
+
+    def _ensure_worker(self):
+        """Start the worker thread on first use"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='xtts-synthesis', daemon=True)
+                self._thread.start()
+
+    def _collect_batch(self) -> list:
+        """Block for one job, then gather whatever else arrives within the batch window"""
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.BATCH_WINDOW_SECONDS
+        while len(items) < self.MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        """Worker loop"""
+        while True:
+            # Shortest first; text length is a close proxy for XTTS token count and decode time
+            groups: Dict[Optional[tuple], list] = {}
+            for item in sorted(self._collect_batch(), key=lambda queued: queued[0]):
+                try:
+                    groups.setdefault(item[1], []).append(item)
+                except TypeError as e:
+                    # An unhashable group key fails only its own job, never the worker
+                    if item[3].set_running_or_notify_cancel():
+                        item[3].set_exception(e)
+
+            # Groups keep the order of their shortest job (dicts preserve insertion order)
+            for group in groups.values():
+                for _, _, job, future in group:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        future.set_result(job())
+                    except Exception as e:
+                        future.set_exception(e)
+
+
+synthesis_scheduler = SynthesisScheduler()
+
+# How long a request waits for its queued synthesis (matches the Electron client's timeouts)
+SYNTHESIS_TIMEOUT_SECONDS = 180
+SYNTHESIS_LONG_TIMEOUT_SECONDS = 300
+
+AUDIO_CACHE_MAX_AGE = 3600  # Seconds clients may reuse a served output file
+
+SERVER_THREADS = 8  # waitress request threads; synthesis itself stays on one worker
+
+
 # ============== REST API Endpoints ==============
 
 @app.route('/health', methods=['GET'])
@@ -591,9 +1434,8 @@ def initialize_models():
 @app.route('/profiles', methods=['GET'])
 def list_profiles():
     """List all voice profiles"""
-    profiles = profile_store.list_profiles()
     return jsonify({
-        'profiles': [asdict(p) for p in profiles]
+        'profiles': profile_store.list_profile_dicts()
     })
 
 
@@ -616,16 +1458,16 @@ def create_profile():
             return jsonify({'error': f'Audio file not found: {path}'}), 400
 
     profile = profile_store.create_profile(name, audio_samples)
-    return jsonify(asdict(profile))
+    return jsonify(profile_store.get_profile_dict(profile.id))
 
 
 @app.route('/profiles/<profile_id>', methods=['GET'])
 def get_profile(profile_id: str):
     """Get a voice profile"""
-    profile = profile_store.get_profile(profile_id)
-    if not profile:
+    profile_dict = profile_store.get_profile_dict(profile_id)
+    if not profile_dict:
         return jsonify({'error': 'Profile not found'}), 404
-    return jsonify(asdict(profile))
+    return jsonify(profile_dict)
 
 
 @app.route('/profiles/<profile_id>', methods=['DELETE'])
@@ -634,6 +1476,7 @@ def delete_profile(profile_id: str):
     success = profile_store.delete_profile(profile_id)
     if not success:
         return jsonify({'error': 'Profile not found'}), 404
+    tts_synthesizer.evict_latents(profile_id)
     return jsonify({'success': True})
 
 
@@ -656,6 +1499,7 @@ def update_profile_samples(profile_id: str):
             return jsonify({'error': f'Audio file not found: {path}'}), 400
 
     # Update and reset to pending state
+    tts_synthesizer.evict_latents(profile_id)
     updated = profile_store.update_profile(
         profile_id,
         audio_samples=audio_samples,
@@ -663,7 +1507,7 @@ def update_profile_samples(profile_id: str):
         progress=0
     )
     if updated:
-        return jsonify(asdict(updated))
+        return jsonify(profile_store.get_profile_dict(profile_id))
     return jsonify({'error': 'Failed to update profile'}), 500
 
 
@@ -740,6 +1584,53 @@ def validate_audio():
     return jsonify(validation_result)
 
 
+VALIDATION_LOUDNESS_SECONDS = 10  # Leading audio used to estimate a sample's loudness
+
+
+def _scan_audio(audio_path: str) -> Tuple[float, int, int, float, bool]:
+    """
+    Measure an audio file without decoding more of it than needed
+
+    Duration and format come from the header. Loudness is estimated from up to
+    VALIDATION_LOUDNESS_SECONDS of audio starting at the first non-silent
+    sample, so leading digital silence neither lowers it nor counts as signal.
+    Containers libsndfile cannot open (the app's WebM recordings) are decoded
+    in full through _load_audio.
+
+    Returns:
+        Tuple of (duration, channels, sample_rate, dbfs, has_signal)
+    """
+    try:
+        info = sf.info(audio_path)
+    except RuntimeError:
+        samples, sample_rate = _load_audio(audio_path)
+        return len(samples) / sample_rate, samples.shape[1], sample_rate, _dbfs(samples), bool(np.any(samples))
+
+    sum_squares = 0.0
+    sample_count = 0
+    has_signal = False
+    frames_wanted = VALIDATION_LOUDNESS_SECONDS * info.samplerate
+    frames_measured = 0
+    with sf.SoundFile(audio_path) as audio:
+        for block in audio.blocks(blocksize=frames_wanted, dtype='float32'):
+            if not has_signal:
+                # Leading digital silence is skipped rather than averaged into the loudness
+                if not np.any(block):
+                    continue
+                block = block[np.argmax(block.reshape(len(block), -1).any(axis=1)):]
+                has_signal = True
+            block = block[:frames_wanted - frames_measured]
+            sum_squares += float(np.sum(np.square(block, dtype=np.float64)))
+            sample_count += block.size
+            frames_measured += len(block)
+            if frames_measured >= frames_wanted:
+                break
+
+    rms = float(np.sqrt(sum_squares / sample_count)) if sample_count else 0.0
+    dbfs = 20 * float(np.log10(rms)) if rms > 0 else float('-inf')
+    return info.duration, info.channels, info.samplerate, dbfs, has_signal
+
+
 def _validate_single_audio(audio_path: str) -> Dict[str, Any]:
     """Validate a single audio file"""
     result = {
@@ -763,23 +1654,22 @@ def _validate_single_audio(audio_path: str) -> Dict[str, Any]:
 
         result['details']['file_size'] = file_size
 
-        from pydub import AudioSegment
-        audio = AudioSegment.from_file(audio_path)
+        duration, channels, sample_rate, dbfs, has_signal = _scan_audio(audio_path)
 
-        result['duration'] = audio.duration_seconds
-        result['details']['channels'] = audio.channels
-        result['details']['sample_rate'] = audio.frame_rate
-        result['details']['dBFS'] = round(audio.dBFS, 2) if audio.dBFS != float('-inf') else -100
+        result['duration'] = duration
+        result['details']['channels'] = channels
+        result['details']['sample_rate'] = sample_rate
+        result['details']['dBFS'] = round(dbfs, 2) if dbfs != float('-inf') else -100
 
-        if audio.max == 0:
+        if not has_signal:
             result['error'] = 'Audio file appears to be silent or corrupted'
             return result
 
-        if audio.dBFS < -50:
+        if dbfs < -50:
             result['is_quiet'] = True
 
-        if audio.duration_seconds < 3:
-            result['error'] = f'Audio too short ({audio.duration_seconds:.1f}s). Minimum 3 seconds required.'
+        if duration < 3:
+            result['error'] = f'Audio too short ({duration:.1f}s). Minimum 3 seconds required.'
             return result
 
         result['valid'] = True
@@ -790,6 +1680,28 @@ def _validate_single_audio(audio_path: str) -> Dict[str, Any]:
         return result
 
 
+def _check_synthesis_fields(text: Any, profile_id: Any, language: Any, speed: Any) -> float:
+    """
+    Check the types of a synthesis request's fields
+
+    Returns:
+        speed as a float
+
+    Raises:
+        ValueError: with a message naming the invalid field
+    """
+    if not isinstance(text, str):
+        raise ValueError('Text must be a string')
+    if not isinstance(profile_id, str):
+        raise ValueError('Profile ID must be a string')
+    if not isinstance(language, str):
+        raise ValueError('Language must be a string')
+    try:
+        return float(speed)
+    except (TypeError, ValueError):
+        raise ValueError('Speed must be a number')
+
+
 @app.route('/synthesize', methods=['POST'])
 def synthesize():
     """Synthesize speech with voice cloning"""
@@ -805,7 +1717,26 @@ def synthesize():
     if not profile_id:
         return jsonify({'error': 'Profile ID is required'}), 400
 
-    output_path = tts_synthesizer.synthesize(text, profile_id, language, speed)
+    try:
+        speed = _check_synthesis_fields(text, profile_id, language, speed)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Cache hits are answered here; only misses wait for the synthesis worker
+    output_path = tts_synthesizer.find_cached(text, profile_id, language, speed)
+    if output_path:
+        return jsonify({
+            'success': True,
+            'audio_path': output_path
+        })
+
+    future = synthesis_scheduler.submit(text, profile_id, language, speed)
+    try:
+        output_path = future.result(timeout=SYNTHESIS_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        # Drop the job if it hasn't started so abandoned requests don't keep the worker busy
+        future.cancel()
+        return jsonify({'error': 'Synthesis timed out'}), 504
 
     if not output_path:
         return jsonify({'error': 'Synthesis failed'}), 500
@@ -831,7 +1762,17 @@ def synthesize_long():
     if not profile_id:
         return jsonify({'error': 'Profile ID is required'}), 400
 
-    result = tts_synthesizer.synthesize_long(text, profile_id, language, speed)
+    try:
+        speed = _check_synthesis_fields(text, profile_id, language, speed)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    future = synthesis_scheduler.submit_long(text, profile_id, language, speed)
+    try:
+        result = future.result(timeout=SYNTHESIS_LONG_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        future.cancel()
+        return jsonify({'error': 'Synthesis timed out'}), 504
 
     if not result:
         return jsonify({'error': 'Synthesis failed'}), 500
@@ -846,7 +1787,11 @@ def synthesize_long():
 
 @app.route('/synthesize/stream', methods=['POST'])
 def synthesize_and_stream():
-    """Synthesize and return audio file directly"""
+    """Synthesize and stream WAV audio while it is being generated
+
+    The response is a chunked WAV whose header declares an unknown length;
+    audio starts as soon as the first tokens are decoded.
+    """
     data = request.json
     text = data.get('text')
     profile_id = data.get('profile_id')
@@ -856,21 +1801,46 @@ def synthesize_and_stream():
     if not text or not profile_id:
         return jsonify({'error': 'Text and profile_id are required'}), 400
 
-    output_path = tts_synthesizer.synthesize(text, profile_id, language, speed)
+    try:
+        speed = _check_synthesis_fields(text, profile_id, language, speed)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    if not output_path:
-        return jsonify({'error': 'Synthesis failed'}), 500
+    try:
+        pcm_chunks = synthesis_scheduler.submit_stream(
+            text, profile_id, language, speed, timeout=SYNTHESIS_TIMEOUT_SECONDS
+        )
+    except FutureTimeoutError:
+        return jsonify({'error': 'Synthesis timed out'}), 504
+    except Exception as e:
+        logger.error(f"TTS streaming failed: {e}")
+        return jsonify({'error': f'Synthesis failed: {e}'}), 500
 
-    return send_file(output_path, mimetype='audio/wav')
+    def generate():
+        yield _streaming_wav_header(model_cache.model.synthesizer.output_sample_rate)
+        try:
+            yield from pcm_chunks
+        except Exception as e:
+            logger.error(f"TTS streaming failed mid-stream: {e}")
+            logger.error(traceback.format_exc())
+
+    return Response(stream_with_context(generate()), mimetype='audio/wav')
 
 
 @app.route('/audio/<filename>', methods=['GET'])
 def get_audio(filename: str):
     """Serve generated audio files"""
-    audio_path = config.output_dir / filename
-    if not audio_path.exists():
+    audio_path = _resolve_audio_path(filename)
+    if not audio_path:
         return jsonify({'error': 'File not found'}), 404
-    return send_file(str(audio_path), mimetype='audio/wav')
+    # Output names are unique per synthesis or content-addressed, so a URL always means the same audio
+    return send_file(
+        audio_path,
+        mimetype='audio/wav',
+        conditional=True,
+        etag=True,
+        max_age=AUDIO_CACHE_MAX_AGE
+    )
 
 
 @app.route('/model/status', methods=['GET'])
@@ -900,7 +1870,13 @@ def main():
     logger.info(f"Starting XTTS service on {args.host}:{args.port}")
     logger.info(f"Data directory: {config.data_dir}")
 
-    app.run(host=args.host, port=args.port, debug=args.debug)
+    threading.Thread(target=_output_eviction_loop, name='xtts-output-eviction', daemon=True).start()
+
+    if WAITRESS_AVAILABLE and not args.debug:
+        # One process owns the model; threads overlap HTTP handling with the synthesis worker
+        serve(app, host=args.host, port=args.port, threads=SERVER_THREADS)
+    else:
+        app.run(host=args.host, port=args.port, debug=args.debug, threaded=True)
 
 
 if __name__ == '__main__':
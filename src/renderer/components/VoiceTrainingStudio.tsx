@@ -25,7 +25,7 @@ const log = createLogger('VoiceTrainingStudio');
 
 // Types for Vosk speech recognition results
 interface VoskResult {
-  type: 'partial' | 'final';
+  type: 'partial' | 'confirmed' | 'final';
   text: string;
   words?: Array<{
     word: string;